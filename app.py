@@ -401,13 +401,8 @@ def main():
     if args.expname is None:
         args.expname = Path.cwd().name
 
-    try:
-        assert env.grep_remote_file('jops@ccs', '/ccs/var/log2vex/MASTER_PROJECTS.LIS',
-                                    args.expname.upper()) != '', \
-            f"The experiment name {args.expname} is not recognized " \
-            "(not present in MASTER_PROJECTS). " \
-            "You may need to manually specify with --expname"
-    except ValueError:
+    # The result is kept for the Experiment created below, so MASTER_PROJECTS is only read once
+    if args.expname.upper() not in experiment.fetch_masterprojects([args.expname]):
         rprint(f"[italic red]The assumed eperiment code {args.expname} "
                    "is not recognized.[/italic red]")
         rprint('\n' + description)
@@ -1,7 +1,6 @@
 import abc
 import sys
 from . import experiment
-from . import environment
 
 class Dialog(object, metaclass=abc.ABCMeta):
     """Abstract class that implements the basic functionallity for any
@@ -34,6 +33,8 @@ class Terminal(Dialog):
         It verifies that all introduced antennas are included in the experiment.
         """
         antennas = []
+        # The antennas in the experiment do not change while asking
+        all_ants = tuple(exp.antennas.names)
         while True:
             try:
                 output = input(asking_text).replace('\n', '')
@@ -41,15 +42,16 @@ class Terminal(Dialog):
                     antennas = [ant.strip().capitalize() for ant in \
                                 output.split(',' if ',' in output else ' ')]
                     for antenna in antennas:
-                        if antenna not in exp.antennas.names:
+                        if antenna not in all_ants:
                             raise ValueError(f"Antenna {antenna} not recognized (not included "
-                                             f"in {', '.join(exp.antennas.names)})")
+                                             f"in {', '.join(all_ants)})")
                 break
             except ValueError as e:
                 print(f'ValueError: {e}.')
                 continue
             except KeyboardInterrupt:
-                print('\nPipeline aborted !')
+                sys.stdout.write('\nPipeline aborted !\n')
+                sys.stdout.flush()
                 sys.exit(1)
 
         return antennas
@@ -69,6 +71,7 @@ class Terminal(Dialog):
         It returns a bool indicating if the dialog and recording of the parameters
         went sucessfully.
         """
+        from . import environment
         print("\n\n\n### Please answer to the following questions:\n")
         while True:
             try:
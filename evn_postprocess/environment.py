@@ -1,6 +1,10 @@
 import os
 import sys
+import signal
+import asyncio
+import functools
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Union
 from pathlib import Path
 from astropy import units as u
@@ -9,13 +13,22 @@ from . import process_eee as eee
 from . import process_pipe as pipe
 
 
+# Options for all ssh/scp connections so they share one multiplexed connection per host,
+# instead of doing a full handshake on every call. The master connection is kept alive for
+# a while after the last call.
+# Note that the master keeps open the stderr of the call that started it: stderr must then
+# never be piped in ssh/scp calls, or reading it would wait until the master exits.
+SSH_OPTIONS = ['-o', 'ControlMaster=auto', '-o', 'ControlPath=~/.ssh/evnpp-%C',
+               '-o', 'ControlPersist=120s']
+
+
 def scp(originpath: str, destpath: str, timeout: Optional[Union[float,int]] = None) -> tuple:
     """Does a scp from originpath to destpath. If the process returns an error,
     then it raises ValueError.
     """
     print("\n\033[1m> " + f"scp {originpath} {destpath}" + "\033[0m")
-    process = subprocess.run(["scp", originpath, destpath], shell=False,
-                              stdout=None, stderr=subprocess.PIPE, timeout=timeout)
+    process = subprocess.run(["scp", *SSH_OPTIONS, originpath, destpath], shell=False,
+                              stdout=None, stderr=subprocess.DEVNULL, timeout=timeout)
     if process.returncode != 0:
         raise ValueError(f"\nError code {process} when running scp {originpath} {destpath} in ccs.")
 
@@ -23,21 +36,23 @@ def scp(originpath: str, destpath: str, timeout: Optional[Union[float,int]] = No
 
 
 def ssh(computer: str, commands: str, shell: bool = False, stdout: Optional[int] = subprocess.PIPE,
-        stderr: Optional[int] = subprocess.PIPE) -> tuple:
+        stderr: Optional[int] = subprocess.DEVNULL) -> tuple:
     """Sends a ssh command to the indicated computer.
     Returns the output or raises ValueError in case of errors.
     The output is expected to be in UTF-8 format.
     """
     print("\n\033[1m> " + f"ssh {computer} {commands}" + "\033[0m")
-    process = subprocess.Popen(["ssh", computer, commands], shell=shell, stdout=stdout,
-                               stderr=stderr)
+    process = subprocess.Popen(["ssh", *SSH_OPTIONS, computer, commands], shell=shell,
+                               stdout=stdout, stderr=stderr)
+    # communicate() closes the pipes, so it can only be called once
+    output, _ = process.communicate()
     # logger.info(output)
-    if (process.returncode != 0) and (process.returncode is not None):
+    if process.returncode != 0:
         raise ValueError(f"Error code {process.returncode} when running " \
                          f"ssh {computer}:{commands} in ccs.")
 
-    if process.communicate()[0] is not None:
-        return f"ssh {computer}:{commands}", process.communicate()[0].decode('utf-8')
+    if output is not None:
+        return f"ssh {computer}:{commands}", output.decode('utf-8')
 
     return f"ssh {computer}:{commands}", None
 
@@ -73,14 +88,112 @@ def shell_command(command: str, parameters: Optional[Union[str, list]] = None, s
     return ' '.join(full_shell_command), ''.join(output_lines)
 
 
+async def _shell_command_async(full_shell_command: list[str], semaphore: asyncio.Semaphore,
+                               stdout: Optional[int], stderr: Optional[int], exp=None) -> tuple:
+    """Runs one command for shell_commands once the semaphore allows it.
+    """
+    command = ' '.join(full_shell_command)
+    async with semaphore:
+        print("\n\033[1m> " + f"{command}" + "\033[0m")
+        # In its own process group, so the shell and everything it started can be stopped at once
+        process = await asyncio.create_subprocess_shell(command, stdout=stdout, stderr=stderr,
+                                                        start_new_session=True)
+        try:
+            output, _ = await process.communicate()
+        except asyncio.CancelledError:
+            # e.g. on KeyboardInterrupt: the process must not be left running on its own
+            try:
+                os.killpg(process.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+            await process.wait()
+            raise
+
+    output = '' if output is None else output.decode('utf-8')
+    if output != '':
+        # Shown once the command has finished, so it does not interleave with the output of
+        # the other commands
+        print("\n\033[1m> " + f"{command} (output)" + "\033[0m\n" + output)
+
+    if exp is not None:
+        # Progress lines rewritten with \r are only logged in their final state
+        lines = [a_line.split('\r')[-1] for a_line in output.rstrip('\n').split('\n')] \
+                if output != '' else []
+        exp.log('\n'.join([command, *(f"# {a_line}" for a_line in lines)]), timestamp=True)
+
+    if process.returncode != 0:
+        raise ValueError(f"Error code {process.returncode} when running {command}.")
+
+    return command, output
+
+
+async def _shell_commands_async(full_shell_commands: list[list[str]],
+                                max_concurrency: Optional[int], stdout: Optional[int],
+                                stderr: Optional[int], exp=None) -> list[tuple]:
+    semaphore = asyncio.Semaphore(max_concurrency or max(1, len(full_shell_commands)))
+    # All commands run until they finish even if one fails, so none is left running (or
+    # half-written) once the error is raised
+    results = await asyncio.gather(*[_shell_command_async(a_command, semaphore, stdout, stderr,
+                                                          exp)
+                                     for a_command in full_shell_commands],
+                                   return_exceptions=True)
+    for a_result in results:
+        if isinstance(a_result, BaseException):
+            raise a_result
+
+    return results
+
+
+def shell_commands(commands: list[tuple[str, Optional[Union[str, list]]]],
+                   max_concurrency: Optional[int] = None, stdout: Optional[int] = subprocess.PIPE,
+                   stderr: Optional[int] = subprocess.PIPE, exp=None) -> list[tuple]:
+    """Runs the provided commands (each one a tuple with the command and its parameters,
+    as in shell_command) in the shell at the same time, up to max_concurrency at once
+    (all of them by default).
+    The captured output of each command is shown once it finishes. If exp (an
+    experiment.Experiment) is given, each command and its output are also written into
+    its log, even if the command fails.
+    Returns a list with the (command, output) of each of them, in the same order,
+    or raises ValueError if any fails (once all of them have finished).
+    The output is empty if stdout is not captured.
+    """
+    full_shell_commands = []
+    for command, parameters in commands:
+        if isinstance(parameters, list):
+            full_shell_commands.append([command] + parameters)
+        else:
+            full_shell_commands.append([command] if parameters is None else [command, parameters])
+
+    return asyncio.run(_shell_commands_async(full_shell_commands, max_concurrency, stdout, stderr,
+                                             exp))
+
+
+def shell_command_nowait(command: str, parameters: Optional[Union[str, list]] = None,
+                         stderr: Optional[int] = subprocess.DEVNULL) -> tuple:
+    """Starts the provided command with some arguments if necessary, without waiting for it
+    to finish (e.g. for GUI programs). Its output is discarded, and also its error output
+    unless another stderr is given (e.g. subprocess.PIPE, to read it once the process finishes).
+    Returns the full command and the running process (subprocess.Popen).
+    """
+    if isinstance(parameters, list):
+        full_shell_command = [command] + parameters
+    else:
+        full_shell_command = [command] if parameters is None else [command, parameters]
+
+    print("\n\033[1m> " + f"{' '.join(full_shell_command)} &" + "\033[0m")
+    process = subprocess.Popen(full_shell_command, stdout=subprocess.DEVNULL, stderr=stderr)
+    return ' '.join(full_shell_command), process
+
+
 def remote_file_exists(host: str, path: str) -> bool:
     """Checks if a file or path exists in a remote computer returning a bool.
     It may raise an Exception.
     """
     # Test does not work if finds multiple files.
     # status = subprocess.call(['ssh', host, f"test -f {path}"])
-    status = subprocess.call(['ssh', host, f"ls {path}"],
-                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    status = subprocess.call(['ssh', *SSH_OPTIONS, host, f"ls {path}"],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     if status == 0:
         return True
     elif (status == 1) or (status == 2):
@@ -89,19 +202,30 @@ def remote_file_exists(host: str, path: str) -> bool:
     raise Exception(f"SSH connection to {host} failed.")
 
 
-def grep_remote_file(host: str, remote_file: str, word: str) -> str:
+def grep_remote_file(host: str, remote_file: str, word: str,
+                     timeout: Optional[Union[float,int]] = 30) -> str:
     """Runs a grep in a file located in a remote host and returns it.
-    It may raise ValueError if there is a problem accessing the host or file.
+    It may raise ValueError if there is a problem accessing the host or file, or if the
+    host does not answer within timeout seconds (None to wait indefinitely).
+    The default timeout leaves room for the first connection to the host, which also sets up
+    the shared ssh connection (see SSH_OPTIONS).
     """
     cmd = f"grep {word} {remote_file}"
-    process = subprocess.Popen(["ssh", host, cmd], shell=False, stdout=subprocess.PIPE,
-                               stderr=subprocess.PIPE)
-    output = process.communicate()[0].decode('utf-8')
+    try:
+        # stderr is not piped (see SSH_OPTIONS).
+        # All fds opened by Python are non-inheritable, so there is no need to close them.
+        process = subprocess.run(["ssh", *SSH_OPTIONS, host, cmd], shell=False,
+                                 stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                 close_fds=False, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired as e:
+        raise ValueError(f"No answer from {host} after {timeout} s when searching " \
+                         f"for {word} in {remote_file}.") from e
+
     if process.returncode != 0:
         raise ValueError(f"Errorcode {process.returncode} when searching " \
                          f"for {word} in {remote_file} from {host}.")
 
-    return output
+    return process.stdout
 
 
 def create_all_dirs(exp) -> bool:
@@ -168,15 +292,44 @@ def update_lis_file(lisfilename: Union[str, Path], oldexp: str, newexp: str) ->
         lisfile.write(''.join(lisfilelines))
 
 
-def split_lis_cont_line(fulllisfile: str) -> None:
+def _name_matches(filename: str, prefix: str, suffix: str) -> bool:
+    """Returns if the file name matches the glob pattern f"{prefix}*{suffix}".
+    As in glob, hidden files are only matched if the prefix starts with a dot.
+    """
+    return filename.startswith(prefix) and filename.endswith(suffix) and \
+           (len(filename) >= len(prefix) + len(suffix)) and \
+           (prefix.startswith('.') or not filename.startswith('.'))
+
+
+def local_files(prefix: str = '', suffix: str = '', path: Union[str, Path] = '.') -> list[str]:
+    """Returns the (sorted) names of the files in path that start with prefix and end with suffix.
+    Equivalent to `sorted(glob.glob(f"{prefix}*{suffix}"))` but with a single directory scan
+    and no fnmatch translation.
+    """
+    with os.scandir(path) as entries:
+        return sorted(an_entry.name for an_entry in entries
+                      if _name_matches(an_entry.name, prefix, suffix))
+
+
+def local_files_exist(prefix: str = '', suffix: str = '', path: Union[str, Path] = '.') -> bool:
+    """Returns if at least one file in path starts with prefix and ends with suffix.
+    Equivalent to `len(glob.glob(f"{prefix}*{suffix}")) > 0` but stops at the first match
+    instead of listing and matching the whole directory.
+    """
+    with os.scandir(path) as entries:
+        return any(_name_matches(an_entry.name, prefix, suffix) for an_entry in entries)
+
+
+def split_lis_cont_line(fulllisfile: str) -> list[str]:
     """Given a lis file, it checks if there are jobs set as prod_cont and prod_line.
     If not, it does nothing. Otherwise, it splits the lis file into two lis files,
     one for the continuum pass and another one for the line pass.
+    Returns the lis file(s) present after the operation.
     """
     # Checks that there are more than one PROD pass
     n_prods = set()
     with open(fulllisfile) as f_full:
-        for a_fileline in f_full.readlines():
+        for a_fileline in f_full:
             temp = a_fileline.split()
             if 'PROD' in temp:
                 n_prods.add(temp[temp.index('PROD') + 1])
@@ -188,7 +341,7 @@ def split_lis_cont_line(fulllisfile: str) -> None:
         lis_line = fulllisfile.replace('.lis', '_line.lis')
         with open(lis_cont, 'w') as f_cont, open(lis_line, 'w') as f_line:
             with open(fulllisfile) as f_full:
-                for a_fileline in f_full.readlines():
+                for a_fileline in f_full:
                     if a_fileline[0].strip() not in ('+', '-'):
                         f_cont.write(a_fileline.replace('.ms', '_cont.ms'))
                         f_line.write(a_fileline.replace('.ms', '_line.ms'))
@@ -201,6 +354,21 @@ def split_lis_cont_line(fulllisfile: str) -> None:
                             f_cont.write(a_fileline)
 
         os.remove(fulllisfile)
+        return [lis_cont, lis_line]
+
+    return [fulllisfile]
+
+
+def _run_checklis(lisfile: str) -> tuple:
+    """Runs checklis.py on the given lis file without printing anything.
+    Returns the command and its output, or raises ValueError if fails.
+    """
+    cmd = f"checklis.py {lisfile}"
+    process = subprocess.run(cmd, shell=True, capture_output=True)
+    if process.returncode != 0:
+        raise ValueError(f"Error code {process.returncode} when running {cmd}.")
+
+    return cmd, process.stdout.decode('utf-8')
 
 
 def check_lisfiles(exp) -> bool:
@@ -209,16 +377,23 @@ def check_lisfiles(exp) -> bool:
     missing scans, etc), it will return False. Otherwise it will return true.
     """
     all_good: bool = True
-    for a_pass in exp.correlator_passes:
-        cmd, output = shell_command("checklis.py", a_pass.lisfile.name, shell=True)
+    # Each checklis.py call is independent (and mostly spent starting Python), so they run
+    # concurrently; the outputs are then reported in the order of the passes
+    lisfiles = [a_pass.lisfile.name for a_pass in exp.correlator_passes]
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(lisfiles)))) as pool:
+        results = list(pool.map(_run_checklis, lisfiles))
+
+    for cmd, output in results:
+        print("\n\033[1m> " + cmd + "\033[0m")
+        print(output, end='')
         exp.log(f"{cmd}"+"\n#"+output.replace('\n', '\n#'), False)
         # The output has the form:
         #      First scan = X
         #       {errors if any otherwise no extra lines}
         #      Last scan = Y
         # removing any possible trailing empty line:
-        temp = [o for o in output.split('\n') if len(o) > 0]
-        all_good = all_good and (not (len(temp) > 2)) and (all(['No scans in' not in t for t in temp]))
+        temp = [o for o in output.splitlines() if len(o) > 0]
+        all_good = all_good and (not (len(temp) > 2)) and (not any('No scans in' in t for t in temp))
 
     return all_good
 
@@ -249,19 +424,23 @@ def update_pipelinable_passes(exp, pipelinable: Union[list, dict]) -> None:
                     break
 
 
+@functools.lru_cache(maxsize=8)
+def _file_contains(a_file: str, word: str, mtime: int) -> bool:
+    """Returns if the word is present in the given file. Cached per file modification time
+    (mtime), so the file is only read again if it has changed.
+    """
+    with open(a_file, 'r') as thefile:
+        return any(word in a_line for a_line in thefile)
+
+
 def station_1bit_in_vix(vexfile: str) -> bool:
     """Checks if there is any station in the vex file that recorded at 1 bit.
     Note that this/these station(s) may or may not have recorded at 1 bit in this experiment,
     but only at other moment of the run.
     """
-    output = subprocess.call(["grep", "1bit", vexfile], shell=False, stdout=subprocess.PIPE)
-    if output == 0:
-        # There is at least one station recording at 1 bit.
-        return True
-    elif output == 1:
-        return False
-    else:
-        # File not found
+    try:
+        return _file_contains(str(vexfile), '1bit', os.stat(vexfile).st_mtime_ns)
+    except FileNotFoundError:
         raise FileNotFoundError(f"{vexfile} file not found.")
 
 
@@ -289,7 +468,7 @@ def archive(flag: str, exp, rest_parameters: str) -> tuple:
     Flag can be -auth, -stnd, -fits,...
     """
     cmd, output = shell_command("/home/jops/scripts/archive.pl",
-                                [flag, "-e", f"{exp.expname.lower()}_{exp.obsdate}",
+                                [flag, "-e", f"{exp.expname_lower}_{exp.obsdate}",
                                  rest_parameters], shell=True)
     exp.log(cmd, '# '+'# '.join(output))
     return cmd, output
@@ -7,8 +7,12 @@ This also keeps track of the steps that have been condducted in the post-process
 resumed, or restarted.
 """
 import os
-import glob
+import re
+import sys
 import copy
+import mmap
+import operator
+import functools
 import numpy as np
 import pickle
 import json
@@ -16,14 +20,13 @@ import subprocess
 import datetime as dt
 from typing import Optional, Union, Iterable, Any, Generator
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from collections import defaultdict
-from pyrap import tables as pt
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 from astropy import units as u
 from rich import print as rprint
 from rich import progress
-import blessed
 from . import environment as env
 from . import dialog
 
@@ -41,6 +44,179 @@ def percent(value: float, total: float) -> float:
     return (value/total)*100.0
 
 
+def _simple_attr(attribute: str, doc: Optional[str] = None, readonly: bool = False) -> property:
+    """Returns a property that directly gets (and sets, unless readonly) the given
+    private attribute, with no further logic.
+    """
+    def setter(self, value):
+        setattr(self, attribute, value)
+
+    return property(operator.attrgetter(attribute), None if readonly else setter, doc=doc)
+
+
+def _set_slots_state(obj, state, renamed: Optional[dict[str, str]] = None):
+    """Restores the pickled state of an object whose class uses __slots__.
+    It also accepts the __dict__ state of objects pickled before the class had __slots__
+    (e.g. stored experiments from previous versions), in which the attributes listed in
+    renamed ({old name: current name}) had a different name.
+    """
+    if isinstance(state, tuple):
+        # (__dict__, slots) pair, as pickled for classes with __slots__
+        state = {**(state[0] or {}), **(state[1] or {})}
+
+    for key, value in state.items():
+        object.__setattr__(obj, renamed.get(key, key) if renamed else key, value)
+
+
+# Lines of interest in the .expsum files
+_PI_RE = re.compile(r'Principal Investigator:\s*(?P<name>[^()]+?)\s*\(\s*(?P<email>[^)]+)\)')
+_COI_RE = re.compile(r'co-I information[:\s]*(?P<name>[^()]+?)\s*\(\s*(?P<email>[^)]+)\)')
+_SCHED_RE = re.compile(r'scheduled telescopes[^:]*:(?P<antennas>.*)')
+_SRC_RE = re.compile(r'src\s*=\s*(?P<name>[^,\s]+).*?type\s*=\s*(?P<type>\w+).*?use\s*=\s*(?P<use>\w+)')
+
+
+def _ms_getcolnp(table, colname: str, dtype, shape: tuple = ()) -> np.ndarray:
+    """Reads a column into a preallocated buffer, avoiding the array allocation done by getcol.
+    """
+    buffer = np.empty((table.nrows(),) + shape, dtype=dtype)
+    table.getcolnp(colname, buffer)
+    return buffer
+
+
+def _ms_subtable(msfile: str, subtable: str):
+    """Opens (read only) the given subtable of a MS file without opening the main table.
+    It may raise RuntimeError if it cannot be opened.
+    """
+    # Imported here as it is only needed once the MS files exist and it is slow to load
+    from casacore import tables as pt
+    return pt.table(f"{msfile}/{subtable}", readonly=True, ack=False)
+
+
+# Tables of a MS (main table and subtables) that are read to get the setup of the observation
+_MS_SETUP_TABLES = ('', 'ANTENNA', 'FIELD', 'OBSERVATION', 'SPECTRAL_WINDOW', 'DATA_DESCRIPTION')
+
+
+def _ms_signature(msfile: str) -> tuple:
+    """Returns the (table, file, mtime, size) of all files of the MS tables read for the setup.
+    Steps like polswap or flag_weights rewrite these files in place, which does not change the
+    modification time of the MS directory itself.
+    It raises FileNotFoundError if the MS file (or any of these tables) does not exist.
+    """
+    signature = []
+    for a_table in _MS_SETUP_TABLES:
+        with os.scandir(os.path.join(msfile, a_table)) as entries:
+            for entry in entries:
+                # The lock file changes by only opening the table
+                if entry.name.startswith('table.') and (entry.name != 'table.lock') and \
+                   entry.is_file():
+                    stat = entry.stat()
+                    signature.append((a_table, entry.name, stat.st_mtime_ns, stat.st_size))
+
+    return tuple(sorted(signature))
+
+
+# The following readers are cached for each (msfile, signature), so passes sharing the same MS
+# (or repeated calls) only read it once.
+@functools.lru_cache(maxsize=16)
+def _read_ms_antennas(msfile: str, signature: tuple) -> tuple[str, ...]:
+    """Returns the names of the antennas in the MS file.
+    """
+    with _ms_subtable(msfile, 'ANTENNA') as ms_ant:
+        return tuple(sys.intern(ant) for ant in ms_ant.getcol('NAME'))
+
+
+@functools.lru_cache(maxsize=16)
+def _read_ms_sources(msfile: str, signature: tuple) -> tuple[str, ...]:
+    """Returns the names of the fields in the MS file.
+    """
+    with _ms_subtable(msfile, 'FIELD') as ms_field:
+        return tuple(sys.intern(src) for src in ms_field.getcol('NAME'))
+
+
+@functools.lru_cache(maxsize=16)
+def _read_ms_timerange(msfile: str, signature: tuple) -> tuple[dt.datetime, dt.datetime]:
+    """Returns the start and end time of the observation in the MS file.
+    """
+    with _ms_subtable(msfile, 'OBSERVATION') as ms_obs:
+        time_range = _ms_getcolnp(ms_obs, 'TIME_RANGE', np.float64, (2,))
+
+    # MJD in seconds converted within numpy, only the two endpoints become datetime
+    return tuple((np.datetime64('1858-11-17T00:00:02') + \
+                  (time_range[0]*1e6).astype('timedelta64[us]')).tolist())
+
+
+@functools.lru_cache(maxsize=16)
+def _read_ms_freqsetup(msfile: str, signature: tuple) -> 'Subbands':
+    """Returns the frequency setup of the MS file.
+    """
+    with _ms_subtable(msfile, 'SPECTRAL_WINDOW') as ms_spw:
+        # All subbands share the number of channels and bandwidth: read them from the
+        # first row in a single call
+        spw_row = ms_spw.row(['NUM_CHAN', 'TOTAL_BANDWIDTH']).get(0)
+        num_chan, total_bw = int(spw_row['NUM_CHAN']), float(spw_row['TOTAL_BANDWIDTH'])
+        chan_freq = _ms_getcolnp(ms_spw, 'CHAN_FREQ', np.float64, (num_chan,))
+
+    return Subbands(num_chan, chan_freq, total_bw)
+
+
+@functools.lru_cache(maxsize=16)
+def _read_ms_antenna_subbands(msfile: str, signature: tuple,
+                              show_progress: bool = True) -> dict[str, tuple]:
+    """Returns the subbands where each antenna has non-zero data (in the autocorrelations)
+    in the MS file. Antennas without data are not included.
+    The progress of the reading is shown in the terminal unless show_progress is False.
+    """
+    # Imported here as it is only needed once the MS files exist and it is slow to load
+    from casacore import tables as pt
+    antenna_col = _read_ms_antennas(msfile, signature)
+    with _ms_subtable(msfile, 'DATA_DESCRIPTION') as ms_spws:
+        spw_names = _ms_getcolnp(ms_spws, 'SPECTRAL_WINDOW_ID', np.int32)
+
+    ant_subband = defaultdict(set)
+    # Only the autocorrelations are needed: the cross-correlation data are never read
+    with pt.table(msfile, readonly=True, ack=False) as ms, \
+         ms.query('ANTENNA1 == ANTENNA2', columns='ANTENNA1,DATA_DESC_ID,DATA') as autocorrs:
+        if show_progress:
+            print('\nReading the MS to find the antennas that actually observed...')
+
+        with progress.Progress(disable=not show_progress) as progress_bar:
+            task = progress_bar.add_task("[yellow]Reading MS...", total=len(autocorrs))
+            # The small index columns are read at once, only the visibilities go by chunks
+            all_ants = _ms_getcolnp(autocorrs, 'ANTENNA1', np.int32)
+            all_spws = _ms_getcolnp(autocorrs, 'DATA_DESC_ID', np.int32)
+            known_rows = (all_ants < len(antenna_col)) & np.isin(all_spws, spw_names)
+            for (start, nrow) in chunkert(0, len(autocorrs), 100):
+                ants, spws = all_ants[start:start+nrow], all_spws[start:start+nrow]
+                msdata = autocorrs.getcol('DATA', startrow=start, nrow=nrow)
+                # Rows with any non-zero (or NaN) visibility, for known antennas and subbands
+                with_data = np.any(~(np.abs(msdata) < 1e-5), axis=(1, 2)) & \
+                            known_rows[start:start+nrow]
+                for ant_i, spw in set(zip(ants[with_data].tolist(), spws[with_data].tolist())):
+                    ant_subband[antenna_col[ant_i]].add(spw)
+
+                progress_bar.update(task, advance=nrow)
+
+    return {ant: tuple(sorted(spws)) for ant, spws in ant_subband.items()}
+
+
+def _read_ms_setup(msfile: str, show_progress: bool = True) -> Optional[dict[str, Any]]:
+    """Reads the setup of the observation from the given MS file: its antennas ('antennas'),
+    the subbands where each one has data ('antenna_subbands'), sources ('sources'), time range
+    ('timerange') and frequency setup ('freqsetup').
+    Returns None if the MS file could not be read.
+    """
+    try:
+        signature = _ms_signature(msfile)
+        return {'antennas': _read_ms_antennas(msfile, signature),
+                'antenna_subbands': _read_ms_antenna_subbands(msfile, signature,
+                                                              show_progress=show_progress),
+                'sources': _read_ms_sources(msfile, signature),
+                'timerange': _read_ms_timerange(msfile, signature),
+                'freqsetup': _read_ms_freqsetup(msfile, signature)}
+    except (RuntimeError, OSError):
+        return None
+
+
 class Credentials(object):
     """Authentification for a given experiment. This class specifies two attributes:
         - username : str
@@ -48,6 +224,8 @@ class Credentials(object):
     No restrictions on length/format for them. Once set, they cannot be modified
     (a new object needs to be created).
     """
+    __slots__ = ('_username', '_password')
+
     @property
     def username(self) -> Optional[str]:
         return self._username
@@ -60,22 +238,19 @@ class Credentials(object):
         self._username = username
         self._password = password
 
+    def __setstate__(self, state):
+        _set_slots_state(self, state)
+
     def __iter__(self) -> Generator[tuple[str, str], Any, Any]:
         for key in ('username', 'password'):
             yield key, getattr(self, key)
 
 
     def json(self) -> dict[str, str]:
-        """Returns a dict with all attributes of the object.
-        I define this method to use instead of .__dict__ as the later only reporst
-        the internal variables (e.g. _username instead of username) and I want a better
-        human-readable output.
+        """Returns a dict with all attributes of the object, with empty strings for
+        the attributes that are not set.
         """
-        d = dict()
-        for key, val in self.__iter__():
-            d[key] = val if val is not None else ''
-
-        return d
+        return {key: val if val is not None else '' for key, val in self.__iter__()}
 
 
 class FlagWeight(object):
@@ -139,41 +314,34 @@ class SourceType(Enum):
     other = 3
 
 
-class Source(object):
+# Source types as written in the .expsum files
+_EXPSUM_SOURCE_TYPES = {'target': SourceType.target, 'reference': SourceType.calibrator,
+                        'fringefinder': SourceType.fringefinder,
+                        'calibrator': SourceType.fringefinder}
+
+
+@dataclass(slots=True, eq=False)
+class Source:
     """Defines a source by name, type (i.e. target, reference, fringefinder, other)
     and if it must be protected or not (password required to get its data).
     """
-    @property
-    def name(self) -> str:
-        return self._name
-
-    @property
-    def type(self) -> SourceType:
-        return self._type
-
-    @type.setter
-    def type(self, new_type: SourceType):
-        assert isinstance(new_type, SourceType)
-        self._type = new_type
-
-    @property
-    def protected(self) -> bool:
-        return self._protected
-
-    @protected.setter
-    def protected(self, to_be_protected: bool):
-        assert isinstance(to_be_protected, bool)
-        self._protected = to_be_protected
-
-    def __init__(self, name: str, sourcetype: SourceType, protected: bool):
-        assert isinstance(name, str), f"The name of the source must be a string (currrently {name})"
-        assert isinstance(sourcetype, SourceType), \
-               f"The name of the source must be a SourceType object (currrently {sourcetype})"
-        assert isinstance(protected, bool), \
-               f"The name of the source must be a boolean (currrently {protected})"
-        self._name = name
-        self._type = sourcetype
-        self._protected = protected
+    name: str
+    type: SourceType
+    protected: bool
+
+    def __post_init__(self):
+        assert isinstance(self.name, str), \
+               f"The name of the source must be a string (currrently {self.name})"
+        assert isinstance(self.type, SourceType), \
+               f"The name of the source must be a SourceType object (currrently {self.type})"
+        assert isinstance(self.protected, bool), \
+               f"The name of the source must be a boolean (currrently {self.protected})"
+        self.name = sys.intern(self.name)
+
+    def __setstate__(self, state):
+        # Sources pickled by previous versions stored their attributes as _name, _type, ...
+        _set_slots_state(self, state, {'_name': 'name', '_type': 'type',
+                                       '_protected': 'protected'})
 
     def __iter__(self) -> Generator[tuple[str, Union[str, SourceType, bool]], Any, Any]:
         for key in ('name', 'type', 'protected'):
@@ -208,6 +376,10 @@ class Antenna:
     antabfsfile: bool = False
     opacity: bool = False  # if data have opacity correction in the ANTAB file
 
+    def __post_init__(self):
+        # Antenna names are compared often, so they are interned
+        self.name = sys.intern(self.name)
+
 
 class Antennas(object):
     """List of antennas (Antenna class)
@@ -218,14 +390,29 @@ class Antennas(object):
         else:
             self._antennas = []
 
+        # Same antennas, indexed by name for the lookups and membership tests
+        self._by_name: dict[str, Antenna] = {a.name: a for a in self._antennas}
         self._niter : int = -1
 
 
+    def __getstate__(self) -> dict:
+        # The index by name is not stored, but rebuilt when loaded
+        state = self.__dict__.copy()
+        del state['_by_name']
+        return state
+
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._by_name = {a.name: a for a in self._antennas}
+
+
     def add(self, new_antenna: Antenna):
-        if new_antenna.name in self.names:
+        if new_antenna.name in self._by_name:
             raise KeyError(f"The antenna {new_antenna.name} is already in the list of antennas.")
 
         self._antennas.append(new_antenna)
+        self._by_name[new_antenna.name] = new_antenna
 
 
     @property
@@ -272,10 +459,14 @@ class Antennas(object):
         return len(self._antennas)
 
     def __getitem__(self, key: str) -> Antenna:
-        return self._antennas[self.names.index(key)]
+        try:
+            return self._by_name[key]
+        except KeyError:
+            raise ValueError(f"{key} is not in the list of antennas.") from None
 
     def __delitem__(self, key: str) -> None:
-        return self._antennas.remove(self[key])
+        self._antennas.remove(self[key])
+        del self._by_name[key]
 
     def __iter__(self) -> Iterable[Antenna]:
         self._niter = -1
@@ -293,7 +484,7 @@ class Antennas(object):
         return self._antennas[::-1]
 
     def __contains__(self, key: str) -> bool:
-        return key in self.names
+        return key in self._by_name
 
     def __str__(self) -> str:
         s = ""
@@ -322,55 +513,45 @@ class Antennas(object):
         return d
 
 
-class Subbands(object):
+@dataclass(slots=True, eq=False)
+class Subbands:
     """Defines the frequency setup of a given observation with the following data:
         - n_subbands :  int
-            Number of subbands.
+            Number of subbands (derived from frequencies).
         - channels : int
             Number of channels per subband.
         - frequencies : array-like
             Reference frequency for each channel and subband (NxM array, with N
-            number of subbands, and M number of channels per subband).
+            number of subbands, and M number of channels per subband). It is not copied,
+            but set as read-only.
         - bandwidths : astropy.units.Quantity or float
-            Total bandwidth for each subband.
+            Total bandwidth for each subband. If not units are provided, Hz are assumed.
     """
-    @property
-    def n_subbands(self) -> int:
-        return self._n_subbands
-
-    @property
-    def channels(self) -> int:
-        return self._channels
-
-    @property
-    def frequencies(self) -> np.ndarray:
-        return self._freqs
-
-    @property
-    def bandwidths(self) -> u.Quantity:
-        return self._bandwidths
-
-    def __init__(self, chans: int, freqs: np.ndarray, bandwidths: Union[float, u.Quantity]):
-        """Inputs:
-            - chans : int
-                Number of channels per subband.
-            - freqs : array-like
-                Reference frequency for each channel and subband (NxM array, M number
-                of channels per subband.
-            - bandwidths : float or astropy.units.Quantity
-                Total bandwidth for each subband. If not units are provided, Hz are assumed.
-        """
-        self._n_subbands = freqs.shape[0]
-        assert isinstance(bandwidths, float) or isinstance(bandwidths, u.Quantity), \
-            f"Bandiwdth {bandwidths} is not a float or Quantity as expected " \
-            f"(found type {type(bandwidths)})."
-        assert freqs.shape == (self._n_subbands, chans)
-        self._channels = int(chans)
-        self._freqs = np.copy(freqs)
-        if isinstance(bandwidths, float):
-            self._bandwidths = bandwidths*u.Hz
-        else:
-            self._bandwidths = bandwidths
+    channels: int
+    frequencies: np.ndarray
+    bandwidths: u.Quantity
+    n_subbands: int = field(init=False)
+
+    def __post_init__(self):
+        self.n_subbands = self.frequencies.shape[0]
+        assert isinstance(self.bandwidths, float) or isinstance(self.bandwidths, u.Quantity), \
+            f"Bandiwdth {self.bandwidths} is not a float or Quantity as expected " \
+            f"(found type {type(self.bandwidths)})."
+        assert self.frequencies.shape == (self.n_subbands, self.channels)
+        self.channels = int(self.channels)
+        self.frequencies = np.ascontiguousarray(self.frequencies, dtype=np.float64)
+        # Not copied, but protected against later modifications
+        self.frequencies.flags.writeable = False
+        if isinstance(self.bandwidths, float):
+            self.bandwidths = self.bandwidths*u.Hz
+
+
+    def __setstate__(self, state):
+        # Subbands pickled by previous versions stored their attributes as _channels, _freqs, ...
+        _set_slots_state(self, state, {'_n_subbands': 'n_subbands', '_channels': 'channels',
+                                       '_freqs': 'frequencies', '_bandwidths': 'bandwidths'})
+        # Unpickled arrays are writeable again
+        self.frequencies.flags.writeable = False
 
 
     def __iter__(self):
@@ -401,6 +582,8 @@ class CorrelatorPass(object):
     It contains all relevant information that is pass-depended, e.g. associated .lis and
     MS files, frequency setup, etc.
     """
+    __slots__ = ('_lisfile', '_msfile', '_fitsidifile', '_pipeline', '_sources', '_antennas',
+                 '_flagged_weights', '_freqsetup')
 
     @property
     def lisfile(self) -> Path:
@@ -460,7 +643,7 @@ class CorrelatorPass(object):
 
 
     @property
-    def sources(self) -> list[Source]:
+    def sources(self) -> tuple:
         """List of sources present in this correlator pass.
         """
         return self._sources
@@ -468,7 +651,12 @@ class CorrelatorPass(object):
 
     @sources.setter
     def sources(self, list_of_sources: list[Source]):
-        self._sources = list(list_of_sources)
+        # Tuples come from other passes or the MS reading, already interned
+        if type(list_of_sources) is tuple:
+            self._sources = list_of_sources
+        else:
+            self._sources = tuple(sys.intern(src) if isinstance(src, str) else src
+                                  for src in list_of_sources)
 
 
     @property
@@ -505,13 +693,57 @@ class CorrelatorPass(object):
         self._freqsetup: Union[Subbands, None] = new_freqsetup
 
 
+    def _ms_key(self) -> tuple[str, tuple]:
+        """Key used to cache the data read from the MS file: its name and signature
+        (see _ms_signature).
+        It raises FileNotFoundError if the MS file does not exist.
+        """
+        return self._msfile.name, _ms_signature(self._msfile.name)
+
+
+    @property
+    def ms_antennas(self) -> tuple[str, ...]:
+        """Names of the antennas in the MS file, read on first access.
+        """
+        return _read_ms_antennas(*self._ms_key())
+
+
+    @property
+    def ms_antenna_subbands(self) -> dict[str, tuple]:
+        """Subbands where each antenna has data in the MS file, read on first access.
+        Note that it requires to read all autocorrelations in the MS.
+        """
+        return _read_ms_antenna_subbands(*self._ms_key())
+
+
+    @property
+    def ms_field_sources(self) -> tuple[str, ...]:
+        """Names of the fields in the MS file, read on first access.
+        """
+        return _read_ms_sources(*self._ms_key())
+
+
+    @property
+    def ms_timerange(self) -> tuple[dt.datetime, dt.datetime]:
+        """Start and end time of the observation in the MS file, read on first access.
+        """
+        return _read_ms_timerange(*self._ms_key())
+
+
+    @property
+    def ms_freqsetup(self) -> Subbands:
+        """Frequency setup in the MS file, read on first access.
+        """
+        return _read_ms_freqsetup(*self._ms_key())
+
+
     def __init__(self, lisfile: str, msfile: str, fitsidifile: str, pipeline: bool = True,
                  antennas: Optional[Antennas] = None,
                  flagged_weights: Optional[FlagWeight] = None):
         self._lisfile = Path(lisfile)
         self._msfile = Path(msfile)
         self._fitsidifile = fitsidifile
-        self._sources = []
+        self._sources = tuple()
         self._pipeline = pipeline
         self._freqsetup = None  # Must be an object with subbands, freqs, channels, pols.
         if antennas is None:
@@ -522,6 +754,10 @@ class CorrelatorPass(object):
         self._flagged_weights = flagged_weights
 
 
+    def __setstate__(self, state):
+        _set_slots_state(self, state)
+
+
     def __iter__(self):
         for key in ('lisfile', 'msfile', 'fitsidifile', 'pipeline', 'sources', 'antennas',
                     'flagged_weights', 'freqsetup'):
@@ -548,76 +784,162 @@ class CorrelatorPass(object):
         return d
 
 
+# Lines in MASTER_PROJECTS.LIS: EXP EPOCH [EXP1 EXP2.. for e-EVN runs]
+_MASTERPROJECTS_RE = re.compile(r'^(\S+)\s+(\S+)(.*)$', re.M)
+
+# Observing epoch and e-EVN run name for each experiment, as read from MASTER_PROJECTS.LIS
+_masterprojects: dict[str, tuple[str, Optional[str]]] = {}
+
+
+def _parse_masterprojects(expname: str, output: str) -> tuple[str, Optional[str]]:
+    """Parses the lines of MASTER_PROJECTS.LIS referring to the given experiment and returns
+    the observing epoch (YYMMDD) and the e-EVN run name (None if it was not an e-EVN experiment).
+    It raises ValueError if the experiment is not found.
+    """
+    entries = _MASTERPROJECTS_RE.findall(output)
+    if len(entries) == 2:
+        # It is an e-EVN experiment!
+        # One line will have EXP EPOCH.
+        # The other one eEXP EPOCH EXP1 EXP2..
+        obsdate, eEVNname = '', None
+        for name, epoch, _ in entries:
+            if name == expname:
+                obsdate = epoch
+            else:
+                # The first element is the expname of the e-EVN run
+                eEVNname = name
+
+        return obsdate[2:], eEVNname
+    elif len(entries) == 1:
+        name, epoch, other_exps = entries[0]
+        # If there are more experiments in the line, this is an e-EVN, and this experiment
+        # was the first one (so e-EVN is called the same)
+        return epoch[2:], name if other_exps.strip() != '' else None
+
+    raise ValueError(f"{expname} not found in (ccs) MASTER_PROJECTS.LIS"
+                     + "or server not reachable.")
+
+
+def fetch_masterprojects(expnames: Iterable[str]) -> dict[str, tuple[str, Optional[str]]]:
+    """Reads from MASTER_PROJECTS.LIS (in ccs) the observing epoch (YYMMDD) and the e-EVN run
+    name (None if it was not an e-EVN experiment) of all given experiments with a single
+    connection. The results are kept for any Experiment created later for them.
+    Returns a dict with the experiment names as keys. Experiments that are not found
+    are not included.
+    """
+    expnames = [expname.upper() for expname in expnames]
+    try:
+        output = env.grep_remote_file('jops@ccs', '/ccs/var/log2vex/MASTER_PROJECTS.LIS',
+                                      f"-E '{'|'.join(expnames)}'")
+    except ValueError:
+        # None of them was found
+        return {}
+
+    lines = output.splitlines()
+    for expname in expnames:
+        try:
+            _masterprojects[expname] = _parse_masterprojects(expname,
+                                           ''.join(f"{a_line}\n" for a_line in lines
+                                                   if expname in a_line))
+        except ValueError:
+            pass
+
+    return {expname: _masterprojects[expname] for expname in expnames
+            if expname in _masterprojects}
+
+
+def _fetch_masterprojects(expname: str) -> tuple[str, Optional[str]]:
+    """Obtains the observing epoch (YYMMDD) and the e-EVN run name (None if it was not an
+    e-EVN experiment) for the given experiment from the MASTER_PROJECTS.LIS located in ccs.
+    The result is cached (or taken from a previous fetch_masterprojects call), so the file
+    is only read once per experiment and process.
+    It raises ValueError if the experiment cannot be found.
+    """
+    if expname not in _masterprojects:
+        try:
+            output = env.grep_remote_file('jops@ccs', '/ccs/var/log2vex/MASTER_PROJECTS.LIS',
+                                          expname)
+        except ValueError as e:
+            raise ValueError(f"{e}\n{expname} is probably not in the EVN database.") from e
+
+        _masterprojects[expname] = _parse_masterprojects(expname, output)
+
+    return _masterprojects[expname]
+
+
 class Experiment(object):
     """Defines and EVN experiment with all relevant metadata.
     """
-    @property
-    def expname(self) -> str:
-        """Name of the EVN experiment, in upper case.
-        """
-        return self._expname
+    expname = _simple_attr('_expname', "Name of the EVN experiment, in upper case.",
+                           readonly=True)
+    expname_lower = _simple_attr('_expname_lower', "Name of the EVN experiment, in lower case " \
+                                 "(as used in most file names).", readonly=True)
+    piname = _simple_attr('_piname')
+    email = _simple_attr('_email')
+    supsci = _simple_attr('_supsci')
 
 
     @property
     def eEVNname(self) -> Optional[str]:
         """Name of the e-EVN run in case this experiment was observed in this mode.
-        Otherwise returns None
+        Otherwise returns None. It is read from MASTER_PROJECTS.LIS when first needed.
         """
+        if not self._eEVN_known:
+            self.eEVNname = _fetch_masterprojects(self.expname)[1]
+
         return self._eEVN
 
 
     @eEVNname.setter
     def eEVNname(self, eEVNname: Optional[str]):
         self._eEVN = eEVNname
+        self._eEVN_known = True
 
 
     @property
-    def piname(self) -> list[str]:
-        return self._piname
-
-
-    @piname.setter
-    def piname(self, new_piname: list[str]):
-        self._piname = new_piname
-
-
-    @property
-    def email(self) -> list[str]:
-        return self._email
-
-
-    @email.setter
-    def email(self, new_email: list[str]):
-        self._email = new_email
-
-
-    @property
-    def supsci(self) -> str:
-        return self._supsci
-
-
-    @supsci.setter
-    def supsci(self, supsci: str):
-        self._supsci = supsci
+    def ccsname(self) -> str:
+        """Name under which the experiment was correlated (and stored in ccs): the e-EVN run
+        name if it was observed in this mode, otherwise the experiment name.
+        """
+        return self.expname if self.eEVNname is None else self.eEVNname
 
 
     @property
     def obsdate(self) -> str:
         """Epoch at which the EVN experiment was observed (starting date), in YYMMDD format.
+        It is read from MASTER_PROJECTS.LIS when first needed.
         """
+        if self._obsdate is None:
+            self.obsdate = _fetch_masterprojects(self.expname)[0]
+
         return self._obsdate
 
 
     @obsdate.setter
     def obsdate(self, obsdate: str):
         self._obsdate = obsdate
+        self._obsdatetime = None
+        if len(obsdate) == 6 and obsdate.isdigit():
+            # Faster than strptime, with the same %y pivot (69-99 -> 19xx, 00-68 -> 20xx)
+            year = int(obsdate[:2])
+            try:
+                self._obsdatetime = dt.datetime(2000 + year if year < 69 else 1900 + year,
+                                                int(obsdate[2:4]), int(obsdate[4:6]))
+            except ValueError:
+                pass
 
 
     @property
     def obsdatetime(self) -> dt.datetime:
         """Epoch at which the EVN experiment was observed (starting date), in datetime format.
         """
-        return dt.datetime.strptime(self.obsdate, '%y%m%d')
+        if self._obsdatetime is None:
+            obsdate = self.obsdate
+            if self._obsdatetime is None:
+                # Not a valid date, let strptime report the issue
+                return dt.datetime.strptime(obsdate, '%y%m%d')
+
+        return self._obsdatetime
 
 
     @property
@@ -651,20 +973,21 @@ class Experiment(object):
     @sources.setter
     def sources(self, new_sources: list):
         """List of sources observed in the experiment.
+        The list is stored as given (not copied): callers build it anew for each assignment.
         """
-        self._sources = copy.deepcopy(new_sources)
+        self._sources = new_sources
 
 
-    @property
-    def antennas(self) -> Antennas:
-        """List of antennas that were scheduled during the experiment.
+    def source_names(self, *types: SourceType, protected: Optional[bool] = None) -> list[str]:
+        """Returns the names of the sources with any of the given types (all types if none
+        is given) and, if specified, with the given protected status.
         """
-        return self._antennas
+        return [s.name for s in self._sources if ((not types) or (s.type in types)) and \
+                ((protected is None) or (s.protected is protected))]
 
 
-    @antennas.setter
-    def antennas(self, new_antennas: Antennas):
-        self._antennas = new_antennas
+    antennas = _simple_attr('_antennas', "List of antennas that were scheduled during the " \
+                            "experiment.")
 
 
     @property
@@ -674,12 +997,7 @@ class Experiment(object):
         list of sources.
         """
         if self._src_stdplot is None:
-            src_list = []
-            for a_source in self.sources:
-                if a_source.type == SourceType.fringefinder:
-                    src_list.append(a_source.name)
-
-            return src_list
+            return self.source_names(SourceType.fringefinder)
         else:
             return self._src_stdplot
 
@@ -700,7 +1018,7 @@ class Experiment(object):
     @refant.setter
     def refant(self, new_refant: Union[list, str]):
         if isinstance(new_refant, list):
-            self._refant = list(new_refant)
+            self._refant = new_refant
         elif isinstance(new_refant, str):
             self._refant = [refant.strip() for refant in new_refant.split(',')]
         else:
@@ -709,8 +1027,8 @@ class Experiment(object):
 
 
     @property
-    def correlator_passes(self) -> list[CorrelatorPass]:
-        """List of all correlator passes (one or more) that have been conducted.
+    def correlator_passes(self) -> tuple[CorrelatorPass, ...]:
+        """Tuple of all correlator passes (one or more) that have been conducted.
         Each element of the list is a CorrelatorPass object with all the relevant
         associated information that may vary for each pass.
         The order of the elements is relevant as the first one is considered the
@@ -720,8 +1038,18 @@ class Experiment(object):
 
 
     @correlator_passes.setter
-    def correlator_passes(self, new_passes: list[CorrelatorPass]):
-        self._passes = copy.deepcopy(new_passes)
+    def correlator_passes(self, new_passes: Iterable[CorrelatorPass]):
+        # The passes are only set once all of them are known, and never reordered afterwards
+        self._passes = new_passes if isinstance(new_passes, tuple) else tuple(new_passes)
+
+
+    @property
+    def pipeline_passes(self) -> tuple[CorrelatorPass, ...]:
+        """Tuple of the correlator passes that will be pipelined, in the same order as in
+        correlator_passes (the n-th element is the pass that produces the {expname}_n files).
+        Not cached, as the pipeline flag of each pass can still change during the processing.
+        """
+        return tuple(a_pass for a_pass in self._passes if a_pass.pipeline)
 
 
     def add_pass(self, a_new_pass: CorrelatorPass):
@@ -731,26 +1059,20 @@ class Experiment(object):
             a_new_pass : CorrelatorPass
         """
         assert isinstance(a_new_pass, CorrelatorPass)
-        self._passes.append(a_new_pass)
+        self._passes += (a_new_pass,)
 
 
-    @property
-    def credentials(self) -> Credentials:
-        """Username and password to access the experiment data from the EVN
-        archive during the proprietary period.
-        """
-        return self._credentials
+    credentials = _simple_attr('_credentials', "Username and password to access the " \
+                               "experiment data from the EVN archive during the proprietary " \
+                               "period.", readonly=True)
 
 
     def set_credentials(self, username: Optional[str], password: Optional[str]):
         self._credentials = Credentials(username, password)
 
 
-    @property
-    def cwd(self) -> Path:
-        """Returns the Path to the folder in eee where the experiment is being post-processed.
-        """
-        return self._cwd
+    cwd = _simple_attr('_cwd', "Returns the Path to the folder in eee where the experiment " \
+                       "is being post-processed.", readonly=True)
 
 
     @property
@@ -772,53 +1094,16 @@ class Experiment(object):
         self._special_pars.update(new_param)
 
 
-    @property
-    def last_step(self) -> Optional[str]:
-        """Returns the last post-processing step that did run properly in a tentative previous run.
-        """
-        return self._last_step
-
-
-    @last_step.setter
-    def last_step(self, last_step: Union[str, None]):
-        self._last_step: Union[str, None] = last_step
-
-
-    @property
-    def gui(self) -> dialog.Dialog:
-        """Returns the GUI object that allows to exchange dialogs with the user
-        """
-        return self._gui
-
-
-    @gui.setter
-    def gui(self, gui_object: dialog.Dialog):
-        self._gui = gui_object
-
-
-    @property
-    def silent_mode(self) -> bool:
-        """Returns if the user wants to avoid opening graphical windows as for standard plots.
-        True means that plots will not be automatically openned.
-        """
-        return self._silent
-
-    @silent_mode.setter
-    def silent_mode(self, do_silently: bool):
-        self._silent = do_silently
-
-    @property
-    def graphics(self) -> bool:
-        """Returns if the user wants to avoid launching graphical stuff (like opening plots).
-        True means no graphical opens should take place.
-        False if the user does not mind.
-        """
-        return self._graphics
-
-
-    @graphics.setter
-    def graphics(self, do_graphics: bool):
-        self._graphics = do_graphics
+    last_step = _simple_attr('_last_step', "Returns the last post-processing step that did " \
+                             "run properly in a tentative previous run.")
+    gui = _simple_attr('_gui', "Returns the GUI object that allows to exchange dialogs with " \
+                       "the user")
+    silent_mode = _simple_attr('_silent', "Returns if the user wants to avoid opening " \
+                               "graphical windows as for standard plots. True means that " \
+                               "plots will not be automatically openned.")
+    graphics = _simple_attr('_graphics', "Returns if the user wants to avoid launching " \
+                            "graphical stuff (like opening plots). True means no graphical " \
+                            "opens should take place. False if the user does not mind.")
 
 
     def __init__(self, expname: str, support_scientist: str):
@@ -829,16 +1114,26 @@ class Experiment(object):
                The name of the experiment (case insensitive).
         """
         self._expname = expname.upper()
+        self._expname_lower = expname.lower()
+        # obsdate and eEVNname are only read from MASTER_PROJECTS.LIS when needed
         self._eEVN = None
+        self._eEVN_known = False
         self._piname = []
         self._email = []
         self._supsci = support_scientist.lower()
-        self._obsdate = ''
+        self._obsdate = None
+        self._obsdatetime = None
         self._refant = []
         self._src_stdplot = None
         # TODO: verify this is the path and ask the user if different
         self._cwd = Path().cwd()
-        if self._cwd != Path(f"/data0/{self.supsci}/{self.expname}"):
+        try:
+            # Also true if the current directory is reached through a symbolic link
+            in_expdir = self._cwd.samefile(f"/data0/{self.supsci}/{self.expname}")
+        except FileNotFoundError:
+            in_expdir = False
+
+        if not in_expdir:
             rprint("\n\n[yellow]The current directory is not a default "
                    "one for an experiment.[/yellow]")
             answer = input(f"Do you want to change to /data0/{self.supsci}/{self.expname}?  (y/Y)")
@@ -853,50 +1148,57 @@ class Experiment(object):
         self._sources = []
         self._antennas = Antennas()
         self._credentials = Credentials(None, None)
-        self._passes = []
+        self._passes = ()
         logpath = self.cwd / "logs"
         logpath.mkdir(parents=True, exist_ok=True)
         self._logs = {'dir': logpath, 'file': self.cwd / "processing.log"}
         self._checklist: dict[str, bool] = {}
-        self._local_copy = self.cwd / f"{self.expname.lower()}.obj"
-        self.parse_masterprojects()
+        self._local_copy = self.cwd / f"{self.expname_lower}.obj"
         self._special_pars: dict[str, list[str]] = {}
         self._last_step = None
         self.gui = dialog.Terminal()
         self._silent = False
         self._graphics = True
-        if not self._logs['file'].exists():
+        # Resolved before creating the log file, so a failed MASTER_PROJECTS.LIS lookup does not
+        # leave behind a log without header (which would never be written afterwards)
+        observed_on = self.obsdatetime.strftime('%d %b %Y')
+        try:
+            # Only created (and the header written) if it does not exist yet, without a stat
+            new_logfile = open(self._logs['file'], 'x')
+        except FileExistsError:
+            new_logfile = None
+
+        if new_logfile is not None:
             # Writes down some snippets for jplotter in case the standard one fails.
-            with open(self._logs['file'], 'a') as logfile:
+            with new_logfile as logfile:
                 logfile.write("This is the log file for the Post-Processing of the EVN " \
-                              f"experiment {self._expname}, observed on "\
-                              f"{self.obsdatetime.strftime('%d %b %Y')}.\n")
+                              f"experiment {self._expname}, observed on {observed_on}.\n")
                 logfile.write("The associated JIVE support scientist is " \
                               f"{self._supsci.capitalize()}.\n\n")
                 logfile.write("# Some shortcuts to run manually the standardplots in JPlotter:\n")
-                logfile.write(f"ms {self._expname.lower()}.ms\nindexr\nlistr\nr\n\n")
+                logfile.write(f"ms {self._expname_lower}.ms\nindexr\nlistr\nr\n\n")
                 logfile.write("# Weight plot:\n")
                 logfile.write("bl auto;fq */p;sort bl sb;pt wt;ckey sb sb[none]=1;ptsz 4;pl\n")
-                logfile.write(f"save {self._expname.lower()}-weight.ps\n\n")
+                logfile.write(f"save {self._expname_lower}-weight.ps\n\n")
                 logfile.write("# Amp & phase VS time plots:\n")
                 logfile.write("bl Ef* -auto;fq 5/p;ch 0.1*last:0.9*last;avc vector;nxy 1 4; " \
                               "pt anptime;ckey src src[none]=1;y local;ptsz 2;time none;pl\n")
-                logfile.write(f"save {self._expname.lower()}-ampphase-0.ps\n")
+                logfile.write(f"save {self._expname_lower}-ampphase-0.ps\n")
                 logfile.write("time $start to +50m;pl\n")
-                logfile.write(f"save {self._expname.lower()}-ampphase-1.ps\n\n")
+                logfile.write(f"save {self._expname_lower}-ampphase-1.ps\n\n")
                 logfile.write("# Auto-correlation plots:\n")
                 logfile.write("scan 1;bl auto;fq */p;ch none;avt vector;avc none;pt ampfreq;ckey" \
                               " p p[none]=1;sort bl;new sb false;multi true;y 0 1.6;nxy 2 4;pl\n")
-                logfile.write(f"save {self._expname.lower()}-auto-0.ps\n")
+                logfile.write(f"save {self._expname_lower}-auto-0.ps\n")
                 logfile.write("scan 91;pl\n")
-                logfile.write(f"save {self._expname.lower()}-auto-1.ps\n\n")
+                logfile.write(f"save {self._expname_lower}-auto-1.ps\n\n")
                 logfile.write("# Cross-correlation plots:\n")
                 logfile.write("scan 1;pt anpfreq;bl Ef* -auto;fq *;ckey p['RR']=2 p['LL']=3 " \
                               "p['RL']=4 p['LR']=5;nxy 2 3;y local;draw lines points;multi " \
                               "true;new sb false;ptsz 4;sort bl sb;pl\n")
-                logfile.write(f"save {self._expname.lower()}-cross-0.ps\n")
+                logfile.write(f"save {self._expname_lower}-cross-0.ps\n")
                 logfile.write("scan 91;pl\n")
-                logfile.write(f"save {self._expname.lower()}-cross-1.ps\n\n")
+                logfile.write(f"save {self._expname_lower}-cross-1.ps\n\n")
                 logfile.write("exit\n")
 
 
@@ -904,80 +1206,68 @@ class Experiment(object):
         """Obtains the time range, antennas, sources, and frequencies of the observation
         from all existing passes with MS files and incorporate them into the current object.
         """
+        line_passes = any('_line' in a_lis
+                          for a_lis in env.local_files(self.expname_lower, '.lis'))
+        ms_to_read = sorted({a_pass.msfile.name for i,a_pass in enumerate(self.correlator_passes)
+                             if (i == 0) or line_passes})
+        if len(ms_to_read) > 1:
+            # Each MS is read by a different process (quietly), which returns its setup
+            print('\nReading the MS files to find the antennas that actually observed...')
+            with ProcessPoolExecutor(max_workers=min(8, len(ms_to_read))) as pool:
+                ms_setups = dict(zip(ms_to_read,
+                                     pool.map(functools.partial(_read_ms_setup,
+                                                                show_progress=False),
+                                              ms_to_read)))
+        else:
+            ms_setups = {msfile: _read_ms_setup(msfile) for msfile in ms_to_read}
+
+        # Passes already filled for each MS, as several passes can point to the same MS file
+        passes_by_ms: dict[Path, CorrelatorPass] = {}
         for i,a_pass in enumerate(self.correlator_passes):
-            if (i > 0) and ('_line' not in ''.join(glob.glob(f"{self.expname.lower()}*.lis"))):
-                # then this is just a multiphase center with all setups identical. Do not loop
-                # through all MSs.
-                a_pass.antennas = self.correlator_passes[0].antennas
-                a_pass.sources = self.correlator_passes[0].sources
-                a_pass.freqsetup = self.correlator_passes[0].freqsetup
+            if ((i > 0) and not line_passes) or (a_pass.msfile in passes_by_ms):
+                # then this is just a multiphase center with all setups identical, or a MS that
+                # has already been read. Do not loop through all MSs.
+                ref_pass = passes_by_ms.get(a_pass.msfile, self.correlator_passes[0])
+                a_pass.antennas = ref_pass.antennas
+                a_pass.sources = ref_pass.sources
+                a_pass.freqsetup = ref_pass.freqsetup
                 continue
 
             a_pass.antennas = Antennas()
-            try:
-                with pt.table(a_pass.msfile.name, readonly=True, ack=False) as ms:
-                    with pt.table(ms.getkeyword('ANTENNA'), readonly=True, ack=False) as ms_ant:
-                        antenna_col = ms_ant.getcol('NAME')
-                        for ant_name in antenna_col:
-                            ant = Antenna(name=ant_name, observed=True)
-                            a_pass.antennas.add(ant)
-
-                            if ant_name.capitalize() in self.antennas.names:
-                                self.antennas[ant_name.capitalize()].observed = True
-                            else:
-                                ant = Antenna(name=ant_name, observed=True)
-                                self.antennas.add(ant)
-
-                    with pt.table(ms.getkeyword('DATA_DESCRIPTION'),
-                                  readonly=True, ack=False) as ms_spws:
-                        spw_names = ms_spws.getcol('SPECTRAL_WINDOW_ID')
-
-                    ant_subband = defaultdict(set)
-                    print('\nReading the MS to find the antennas that actually observed...')
-                    with progress.Progress() as progress_bar:
-                        task = progress_bar.add_task("[yellow]Reading MS...", total=len(ms))
-                        for (start, nrow) in chunkert(0, len(ms), 100):
-                            ants1 = ms.getcol('ANTENNA1', startrow=start, nrow=nrow)
-                            ants2 = ms.getcol('ANTENNA2', startrow=start, nrow=nrow)
-                            spws = ms.getcol('DATA_DESC_ID', startrow=start, nrow=nrow)
-                            msdata = ms.getcol('DATA', startrow=start, nrow=nrow)
-
-                            for ant_i,antenna_name in enumerate(antenna_col):
-                                for spw in spw_names:
-                                    cond = np.where((ants1 == ant_i) & (ants2 == ant_i) \
-                                                    & (spws == spw))
-                                    if not (abs(msdata[cond]) < 1e-5).all():
-                                        ant_subband[antenna_name].add(spw)
-
-                            progress_bar.update(task, advance=nrow)
-
-                    for antenna_name in self.antennas.names:
-                        if antenna_name in a_pass.antennas:
-                            a_pass.antennas[antenna_name].subbands = \
-                                      tuple(ant_subband[antenna_name])
-                            a_pass.antennas[antenna_name].observed = \
-                                      len(a_pass.antennas[antenna_name].subbands) > 0
-
-                    # Takes the predefined "best" antennas as reference
-                    if len(self.refant) == 0:
-                        for ant in ('Ef', 'O8', 'Ys', 'Mc', 'Gb', 'At', 'Pt'):
-                            if (ant in a_pass.antennas) and (a_pass.antennas[ant].observed):
-                                self.refant = [ant, ]
-                                break
-
-                    with pt.table(ms.getkeyword('FIELD'), readonly=True, ack=False) as ms_field:
-                        a_pass.sources = ms_field.getcol('NAME')
-
-                    with pt.table(ms.getkeyword('OBSERVATION'), readonly=True, ack=False) as ms_obs:
-                        self.timerange = dt.datetime(1858, 11, 17, 0, 0, 2) + \
-                             ms_obs.getcol('TIME_RANGE')[0]*dt.timedelta(seconds=1)
-                    with pt.table(ms.getkeyword('SPECTRAL_WINDOW'),
-                                  readonly=True, ack=False) as ms_spw:
-                        a_pass.freqsetup = Subbands(ms_spw.getcol('NUM_CHAN')[0],
-                                                    ms_spw.getcol('CHAN_FREQ'),
-                                                    ms_spw.getcol('TOTAL_BANDWIDTH')[0])
-            except RuntimeError:
+            if (ms_setup := ms_setups.get(a_pass.msfile.name)) is None:
                 print(f"WARNING: {a_pass.msfile} not found.")
+                continue
+
+            ms_antennas, ant_subbands = ms_setup['antennas'], ms_setup['antenna_subbands']
+
+            # Names computed once instead of rebuilding the list of names for every antenna
+            exp_ant_names = set(self.antennas.names)
+            for ant_name in ms_antennas:
+                ant = Antenna(name=ant_name, observed=True)
+                a_pass.antennas.add(ant)
+
+                if ant_name.capitalize() in exp_ant_names:
+                    self.antennas[ant_name.capitalize()].observed = True
+                else:
+                    self.antennas.add(Antenna(name=ant_name, observed=True))
+                    exp_ant_names.add(ant_name)
+
+            for ant in a_pass.antennas:
+                if ant.name in exp_ant_names:
+                    ant.subbands = ant_subbands.get(ant.name, tuple())
+                    ant.observed = len(ant.subbands) > 0
+
+            # Takes the predefined "best" antennas as reference
+            if len(self.refant) == 0:
+                for ant in ('Ef', 'O8', 'Ys', 'Mc', 'Gb', 'At', 'Pt'):
+                    if (ant in a_pass.antennas) and (a_pass.antennas[ant].observed):
+                        self.refant = [ant, ]
+                        break
+
+            a_pass.sources = ms_setup['sources']
+            self.timerange = ms_setup['timerange']
+            a_pass.freqsetup = ms_setup['freqsetup']
+            passes_by_ms[a_pass.msfile] = a_pass
 
         for antenna_name in self.antennas.names:
             try:
@@ -994,26 +1284,29 @@ class Experiment(object):
             Number of correlator passes.
             Sources to be observed.
         """
-        with open(self.expsum, 'r') as expsum:
-            expsumlines = expsum.readlines()
-            sources = []
-            for a_line in expsumlines:
-                if 'Principal Investigator:' in a_line:
+        sources = []
+        seen_sources: set[str] = set()
+        # PIs and co-Is are collected locally and only assigned at the end
+        pinames, emails = list(self.piname), list(self.email)
+        seen_pinames: set[str] = set(pinames)
+        if os.path.getsize(self.expsum) == 0:
+            # An empty file cannot be memory-mapped
+            self.sources = sources
+            return
+
+        with open(self.expsum, 'rb') as expsum, \
+             mmap.mmap(expsum.fileno(), 0, access=mmap.ACCESS_READ) as expsum_map:
+            for a_line in iter(expsum_map.readline, b''):
+                a_line = a_line.decode('utf-8', 'replace')
+                if (match := _PI_RE.search(a_line)) or (match := _COI_RE.search(a_line)):
                     # The line is expected to be 'Principal Investigator: SURNAME  (EMAIL)'
-                    piname, email = a_line.split(':')[1].split('(')
-                    if piname.strip() not in self.piname:
-                        self.piname.append(piname.strip())
-                        self.email.append(email.split(')')[0].strip())
-                elif 'co-I information' in a_line:
-                    # Typically it does not show the :
-                    name, email = a_line.replace('co-I information', '').replace(':', '').split('(')
-                    name = name.strip()
-                    email = email.split(')')[0].strip()
-                    if name not in self.piname:
-                        self.piname.append(name)
-                        self.email.append(email)
-                elif 'scheduled telescopes' in a_line:
-                    sched_antennas = a_line.split(':')[1].strip().split(' ')
+                    # or 'co-I information: SURNAME  (EMAIL)' (typically without the :)
+                    if match['name'] not in seen_pinames:
+                        seen_pinames.add(match['name'])
+                        pinames.append(match['name'])
+                        emails.append(match['email'].strip())
+                elif match := _SCHED_RE.search(a_line):
+                    sched_antennas = match['antennas'].strip().split(' ')
                     # The antennas will likely not be defined at this point, it checks and adds it
                     saved_ants = self.antennas.scheduled
                     for ant in sched_antennas:
@@ -1025,36 +1318,23 @@ class Experiment(object):
                         if 'onebit' in self.special_params:
                             for onebit_ant in self.special_params['onebit']:
                                 self.antennas[onebit_ant.capitalize()].onebit = True
-                elif 'correlator passes' in a_line:
-                    # self.correlator_passes = [None]*int(a_line.split()[0])
-                    pass
-                elif 'src = ' in a_line:
+                elif match := _SRC_RE.search(a_line):
                     # Line with src = NAME, type = TYPE (something), use = PROTECTED (something)
-                    srcname, srctype, srcprot = a_line.split(',')
-                    srcname = srcname.split('=')[1].strip()
-                    if srcname not in [s.name for s in sources]:
-                        srctype = srctype.split('=')[1].split('(')[0].strip()
-                        srcprot = srcprot.split('=')[1].split('(')[0].strip()
-                        if srctype == 'target':
-                            srctype = SourceType.target
-                        elif srctype == 'reference':
-                            srctype = SourceType.calibrator
-                        elif srctype == 'fringefinder':
-                            srctype = SourceType.fringefinder
-                        elif srctype == 'calibrator':
-                            srctype = SourceType.fringefinder
-                        else:
-                            srctype = SourceType.other
-
-                        if srcprot == 'YES':
+                    srcname = match['name']
+                    if srcname not in seen_sources:
+                        seen_sources.add(srcname)
+                        srctype = _EXPSUM_SOURCE_TYPES.get(match['type'], SourceType.other)
+                        if match['use'] == 'YES':
                             srcprot = False
-                        elif srcprot == 'NO':
+                        elif match['use'] == 'NO':
                             srcprot = True
                         else:
-                            raise ValueError(f"Unknown 'use' value ({srcprot}) found in expsum.")
+                            raise ValueError(f"Unknown 'use' value ({match['use']}) found in expsum.")
 
                         sources.append(Source(srcname, srctype, srcprot))
 
+        self.piname = pinames
+        self.email = emails
         self.sources = sources
 
 
@@ -1062,40 +1342,7 @@ class Experiment(object):
         """Obtains the observing epoch from the MASTER_PROJECTS.LIS located in ccc.
         In case of being an e-EVN experiment, it will add that information to self.eEVN.
         """
-        cmd = f"grep {self.expname} /ccs/var/log2vex/MASTER_PROJECTS.LIS"
-        process = subprocess.Popen(["ssh", "jops@ccs", cmd], shell=False, stdout=subprocess.PIPE,
-                                   stderr=subprocess.PIPE)
-        output = process.communicate()[0].decode('utf-8')
-        if process.returncode != 0:
-            raise ValueError(f"Errorcode {process.returncode} when reading MASTER_PROJECTS.LIS."
-                             + f"\n{self.expname} is probably not in the EVN database.")
-
-        if output.count('\n') == 2:
-            # It is an e-EVN experiment!
-            # One line will have EXP EPOCH.
-            # The other one eEXP EPOCH EXP1 EXP2..
-            inputs = [i.split() for i in output[:-1].split('\n')]
-            obsdate = ''
-            for an_input in inputs:
-                if an_input[0] == self.expname:
-                    obsdate = an_input[1]
-                else:
-                    # The first element is the expname of the e-EVN run
-                    self.eEVNname = an_input[0]
-
-            self.obsdate = obsdate[2:]
-        elif output.count('\n') == 1:
-            expline = output[:-1].split()
-            if len(expline) > 2:
-                # This is an e-EVN, this experiment was the first one (so e-EVN is called the same)
-                self.eEVNname = expline[0].strip()
-            else:
-                self.eEVNname = None
-
-            self.obsdate = expline[1].strip()[2:]
-        else:
-            raise ValueError(f"{self.expname} not found in (ccs) MASTER_PROJECTS.LIS"
-                             + "or server not reachable.")
+        self.obsdate, self.eEVNname = _fetch_masterprojects(self.expname)
 
 
     @property
@@ -1104,13 +1351,18 @@ class Experiment(object):
         If the file does not exist in the experiment dir (in eee), is retrieved from ccs.
         """
         vixfilepath = Path(f"{self.expname}.vix")
-        ename = self.expname if self.eEVNname is None else self.eEVNname
+        # One stat in the usual case, and the e-EVN name is only needed when retrieving the file
         if not vixfilepath.exists():
+            ename = self.ccsname
             env.scp(f"jops@ccs:/ccs/expr/{ename.upper()}/{ename.lower()}.vix", '.')
             self.log(f"scp jops@ccs:/ccs/expr/{ename.upper()}/{ename.lower()}.vix " \
-                     f"{self.expname.lower()}.vix")
-            os.symlink(f"{ename.lower()}.vix", f"{self.expname}.vix")
-            self.log(f"ln -s {ename.lower()}.vix {self.expname}.vix")
+                     f"{self.expname_lower}.vix")
+            try:
+                os.symlink(f"{ename.lower()}.vix", f"{self.expname}.vix")
+                self.log(f"ln -s {ename.lower()}.vix {self.expname}.vix")
+            except FileExistsError:
+                # The link was left by a previous run (dangling until the scp above)
+                pass
 
         return vixfilepath
 
@@ -1120,10 +1372,10 @@ class Experiment(object):
         """Returns the (Path object) to the .expsum file related to the experimet.
         If the files does not exist in the experiment dir (in eee), is retrieved from archive.
         """
-        expsumfilepath = self.cwd / f"{self.expname.lower()}.expsum"
+        expsumfilepath = self.cwd / f"{self.expname_lower}.expsum"
         if not expsumfilepath.exists():
-            env.scp(f"jops@archive.jive.eu:piletters/{self.expname.lower()}.expsum", '.')
-            self.log(f"scp jops@archive.jive.eu:piletters/{self.expname.lower()}.expsum .")
+            env.scp(f"jops@archive.jive.eu:piletters/{self.expname_lower}.expsum", '.')
+            self.log(f"scp jops@archive.jive.eu:piletters/{self.expname_lower}.expsum .")
 
         return expsumfilepath
 
@@ -1133,10 +1385,10 @@ class Experiment(object):
         """Returns the (Path object) to the .piletter file related to the experimet.
         If the files does not exist in the experiment dir (in eee), is retrieved from archive.
         """
-        piletterpath = self.cwd / f"{self.expname.lower()}.piletter"
+        piletterpath = self.cwd / f"{self.expname_lower}.piletter"
         if not piletterpath.exists():
-            env.scp(f"jops@archive.jive.eu:piletters/{self.expname.lower()}.piletter", '.')
-            self.log(f"scp jops@archive.jive.eu:piletters/{self.expname.lower()}.piletter .")
+            env.scp(f"jops@archive.jive.eu:piletters/{self.expname_lower}.piletter", '.')
+            self.log(f"scp jops@archive.jive.eu:piletters/{self.expname_lower}.piletter .")
 
         return piletterpath
 
@@ -1146,15 +1398,15 @@ class Experiment(object):
         """Returns the (Path object) to the .key file related to the experiment.
         If the file does not exist in the experiment dir (in eee), is retrieved from vlbeer.
         """
-        keyfilepath = self.cwd / f"{self.expname.lower()}.key"
+        keyfilepath = self.cwd / f"{self.expname_lower}.key"
         if not keyfilepath.exists():
             try:
                 env.scp(f"evn@vlbeer.ira.inaf.it:vlbi_arch/" \
-                        f"{self.obsdatetime.strftime('%b%y').lower()}/{self.expname.lower()}.key", \
+                        f"{self.obsdatetime.strftime('%b%y').lower()}/{self.expname_lower}.key", \
                         ".", timeout=120)
                 self.log(f"scp evn@vlbeer.ira.inaf.it:vlbi_arch/" \
                          f"{self.obsdatetime.strftime('%b%y').lower()}/" \
-                         f"{self.expname.lower()}.key .")
+                         f"{self.expname_lower}.key .")
             except subprocess.TimeoutExpired:
                 self.log("Could not retrieve the key file from vlbeer. Check the connection and "
                          "do it manually if you want the key file.")
@@ -1174,15 +1426,15 @@ class Experiment(object):
         """Returns the (Path object) to the .sum file related to the experiment.
         If the file does not exist in the experiment dir (in eee), is retrieved from vlbeer.
         """
-        sumfilepath = self.cwd / f"{self.expname.lower()}.sum"
+        sumfilepath = self.cwd / f"{self.expname_lower}.sum"
         if not sumfilepath.exists():
             try:
                 env.scp(f"evn@vlbeer.ira.inaf.it:vlbi_arch/" \
-                        f"{self.obsdatetime.strftime('%b%y').lower()}/{self.expname.lower()}.sum", \
+                        f"{self.obsdatetime.strftime('%b%y').lower()}/{self.expname_lower}.sum", \
                         ".", timeout=120)
                 self.log(f"scp evn@vlbeer.ira.inaf.it:vlbi_arch/" \
                          f"{self.obsdatetime.strftime('%b%y').lower()}/" \
-                         f"{self.expname.lower()}.sum .")
+                         f"{self.expname_lower}.sum .")
             except subprocess.TimeoutExpired:
                 self.log("Could not retrieve the key file from vlbeer. Check the connection and "
                          "do it manually if you want the key file.")
@@ -1307,6 +1559,25 @@ class Experiment(object):
         return obj
 
 
+    def __setstate__(self, state: dict):
+        """Restores a pickled Experiment. Experiments stored by previous versions may lack
+        some of the current attributes, which are then derived from the stored ones.
+        """
+        self.__dict__.update(state)
+        if '_obsdatetime' not in state:
+            self.obsdate = self._obsdate
+
+        if '_eEVN_known' not in state:
+            # Previous versions always read the e-EVN name from MASTER_PROJECTS.LIS when created
+            self._eEVN_known = True
+
+        if '_expname_lower' not in state:
+            self._expname_lower = self._expname.lower()
+
+        if isinstance(self._passes, list):
+            self.correlator_passes = self._passes
+
+
     def __repr__(self, *args, **kwargs) -> str:
         rep = super().__repr__(*args, **kwargs)
         rep.replace("object", f"object ({self.expname})")
@@ -1341,7 +1612,7 @@ class Experiment(object):
                 d[key] = val.strftime('%Y-%m-%d')
             elif isinstance(val, dt.date):
                 d[key] = val.strftime('%Y-%m-%d')
-            elif isinstance(val, list) and (len(val) > 0) and hasattr(val[0], 'json'):
+            elif isinstance(val, (list, tuple)) and (len(val) > 0) and hasattr(val[0], 'json'):
                 d[key] = [v.json() for v in val]
             elif isinstance(val, tuple) and (len(val) > 0) and isinstance(val[0], dt.datetime):
                 d[key] = [v.strftime('%Y-%m-%d %H:%M:%S') for v in val]
@@ -1398,9 +1669,9 @@ class Experiment(object):
         for name,src_type in zip(('Fringe-finder', 'Target', 'Phase-cal'), \
                                  (SourceType.fringefinder, SourceType.target,
                                   SourceType.calibrator)):
-            src = [s for s in self.sources if s.type is src_type]
+            src = self.source_names(src_type)
             rprint(f"{name}{'' if len(src) == 1 else 's'}: [italic]" \
-                   f"{', '.join([s.name for s in src])}[/italic]")
+                   f"{', '.join(src)}[/italic]")
 
         print("\n")
         rprint("[bold]ANTENNAS[/bold]")
@@ -1435,6 +1706,7 @@ class Experiment(object):
     def print_blessed(self, outputfile=None):
         """Pretty print of the full experiment with all available data.
         """
+        import blessed
         term = blessed.Terminal(force_styling=True)
         s_file = []
         with term.fullscreen(), term.cbreak():
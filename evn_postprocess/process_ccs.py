@@ -6,14 +6,13 @@ perform required changes in intermediate files.
 """
 
 import os
-import glob
 from . import environment
 
 
 def lis_files_in_ccs(exp) -> bool:
     """Returns if there are already lis files created in the experiment directory in ccc.
     """
-    eEVNname = exp.expname if exp.eEVNname is None else exp.eEVNname
+    eEVNname = exp.ccsname
     return environment.remote_file_exists('jops@ccs',
                                           f"/ccs/expr/{eEVNname}/{eEVNname.lower()}*.lis")
 
@@ -21,7 +20,7 @@ def lis_files_in_ccs(exp) -> bool:
 def create_lis_files(exp) -> bool:
     """Creates the lis files in ccs.
     """
-    eEVNname = exp.expname if exp.eEVNname is None else exp.eEVNname
+    eEVNname = exp.ccsname
     if not lis_files_in_ccs(exp):
         print("Creating lis file...")
         cmd = f"cd /ccs/expr/{eEVNname};/ccs/bin/make_lis -e {eEVNname}"
@@ -34,28 +33,33 @@ def create_lis_files(exp) -> bool:
 def get_lis_files(exp) -> bool:
     """Retrieves all lis files available in ccs for this experiment.
     """
-    eEVNname = exp.expname if exp.eEVNname is None else exp.eEVNname
+    eEVNname = exp.ccsname
     cmds = []
-    if len(glob.glob(f"{eEVNname.lower()}*.lis")) == 0:
+    if not environment.local_files_exist(eEVNname.lower(), '.lis'):
         cmd, _ = environment.scp(f"jops@ccs:/ccs/expr/{eEVNname}/{eEVNname.lower()}*.lis", '.')
         exp.log(cmd, False)
 
-    for a_lis in glob.glob("*.lis"):
-        environment.split_lis_cont_line(a_lis)
+    # The directory is only listed once (before any file is split or renamed):
+    # the splitting reports the resulting lis files
+    lisfiles = []
+    with os.scandir('.') as entries:
+        for a_lis in [entry.name for entry in entries if entry.name.endswith('.lis')]:
+            lisfiles += environment.split_lis_cont_line(a_lis)
 
     # In the case of e-EVN runs, a renaming of the lis files may be required:
     if eEVNname != exp.expname:
-        for a_lis in glob.glob("*.lis"):
+        for a_lis in lisfiles:
             # Modify the references for eEVNname to expname inside the lis files
             # if it has not been done yet
-            if exp.expname.lower() not in a_lis:
+            if exp.expname_lower not in a_lis:
                 environment.update_lis_file(a_lis, eEVNname, exp.expname)
                 cmds.append(f" Expname updated from {eEVNname} to {exp.expname} in {a_lis}.")
-                exp.log(f" Expname updated from {eEVNname} to {exp.expname} in {a_lis}.")
+                exp.log(cmds[-1])
 
-            os.rename(a_lis, a_lis.replace(eEVNname.lower(), exp.expname.lower()))
-            cmds.append(f"mv {a_lis} {a_lis.replace(eEVNname.lower(), exp.expname.lower())}")
-            exp.log(f"mv {a_lis} {a_lis.replace(eEVNname.lower(), exp.expname.lower())}")
+            new_lis = a_lis.replace(eEVNname.lower(), exp.expname_lower)
+            os.rename(a_lis, new_lis)
+            cmds.append(f"mv {a_lis} {new_lis}")
+            exp.log(cmds[-1])
 
     return True
 
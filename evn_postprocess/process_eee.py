@@ -6,9 +6,11 @@ perform required changes in intermediate files.
 
 """
 import os
+import re
 import glob
 import string
-import random
+import secrets
+import shutil
 import traceback
 from typing import Optional, Union
 from pathlib import Path
@@ -17,13 +19,14 @@ import subprocess
 import numpy as np
 from astropy import units as u
 from rich import print as rprint
-from concurrent.futures import ProcessPoolExecutor
-from itertools import product
-from evn_support import check_antab_idi
 from . import experiment
 from . import environment
 
 
+# Percentage of flagged data reported by flag_weights.py
+_FLAGGED_RE = re.compile(r'execution\)\.\s*(?P<percentage>[0-9.]+)\s*% data with non-zero weights')
+
+
 def create_folders(exp) -> bool:
     """Creates the folder required for the post-processing of the experiment
     - @eee: /data0/{supportsci}/{exp.upper()}
@@ -35,8 +38,11 @@ def create_folders(exp) -> bool:
             Surname of the assigned support scientist.
     """
     expdir = Path(f"/data0/{exp.supsci.lower()}/{exp.expname.upper()}")
-    if not expdir.exists():
+    try:
         expdir.mkdir(parents=True)
+    except FileExistsError:
+        pass
+    else:
         exp.log(f"mkdir /data0/{exp.supsci.lower()}/{exp.expname.upper()}")
         print(f"Directory '/data0/{exp.supsci.lower()}/{exp.expname.upper()}' has been created.")
 
@@ -48,47 +54,53 @@ def get_passes_from_lisfiles(exp) -> bool:
     Append this information to the current experiment (exp object),
     together with the MS file associated for each of them.
     """
-    lisfiles = glob.glob(f"{exp.expname.lower()}*.lis")
-    thereis_line = True if '_line' in ''.join(lisfiles) else False
+    lisfiles = environment.local_files(exp.expname_lower, '.lis')
+    thereis_line = any('_line' in a_lisfile for a_lisfile in lisfiles)
     i_lines_done = 0
     passes = []
-    if len(lisfiles) > 1:
-        lisfiles.sort()
-
     for i, a_lisfile in enumerate(lisfiles):
+        # Only the header line (the one with the .ms file) is needed, not the scans below
         with open(a_lisfile, 'r') as lisfile:
-            for a_lisline in lisfile.readlines():
-                if '.ms' in a_lisline:  # The header line
-                    # there is only one .ms input there
-                    msname = [elem.strip() for elem in a_lisline.split() if '.ms' in elem][0]
-                    # In case the output FITS IDI name has already been set
-                    if '.IDI' in a_lisline:
-                        fitsidiname = [elem.strip() for elem in \
-                                       a_lisline.split() if '.IDI' in elem][0]
-                        to_pipeline = True if ((fitsidiname.split('_')[-2] == '1') or \
-                                               thereis_line) else False
-                    else:
-                        if thereis_line:
-                            if '_line' in a_lisfile:
-                                fitsidiname = f"{exp.expname.lower()}_{2*i_lines_done + 2}_1.IDI"
-                            else:
-                                fitsidiname = f"{exp.expname.lower()}_{2*i_lines_done + 1}_1.IDI"
+            a_lisline = next((a_line for a_line in lisfile if '.ms' in a_line), None)
 
-                            to_pipeline = True if i_lines_done == 0 else False
-                            if (i % 2 == 0) and (i > 0):
-                                i_lines_done += 1
-                        else:
-                            fitsidiname = f"{exp.expname.lower()}_{i+1}_1.IDI"
-                            to_pipeline = True if (i == 0) else False
-
-                    passes.append(experiment.CorrelatorPass(a_lisfile, msname, fitsidiname,
-                                                            to_pipeline))
-                    # Replaces the old *.UVF string in the .lis file with the FITS IDI
-                    # file name to generate in this pass.
-                    if '.UVF' in a_lisline:
-                        environment.shell_command('sed', ['-i',
-                                                  f"'s/{msname}.UVF/{fitsidiname}/g'", a_lisfile],
-                                                  shell=True, bufsize=-1)
+        if a_lisline is None:
+            continue
+
+        lisline_elems = a_lisline.split()
+        # there is only one .ms input there (besides the .UVF output in old lis files)
+        msname = next((elem for elem in lisline_elems if ('.ms' in elem) and ('.UVF' not in elem)),
+                      None)
+        if msname is None:
+            raise ValueError(f"Could not find the MS name in the header of {a_lisfile}.")
+
+        # In case the output FITS IDI name has already been set
+        if '.IDI' in a_lisline:
+            fitsidiname = next(elem for elem in lisline_elems if '.IDI' in elem)
+            to_pipeline = True if ((fitsidiname.split('_')[-2] == '1') or \
+                                   thereis_line) else False
+        else:
+            if thereis_line:
+                if '_line' in a_lisfile:
+                    fitsidiname = f"{exp.expname_lower}_{2*i_lines_done + 2}_1.IDI"
+                else:
+                    fitsidiname = f"{exp.expname_lower}_{2*i_lines_done + 1}_1.IDI"
+
+                to_pipeline = True if i_lines_done == 0 else False
+                if (i % 2 == 0) and (i > 0):
+                    i_lines_done += 1
+            else:
+                fitsidiname = f"{exp.expname_lower}_{i+1}_1.IDI"
+                to_pipeline = True if (i == 0) else False
+
+        passes.append(experiment.CorrelatorPass(a_lisfile, msname, fitsidiname, to_pipeline))
+        # Replaces the old *.UVF string in the .lis file with the FITS IDI
+        # file name to generate in this pass.
+        if '.UVF' in a_lisline:
+            with open(a_lisfile, 'r') as lisfile, open(f"{a_lisfile}~", 'w') as newlisfile:
+                for a_line in lisfile:
+                    newlisfile.write(a_line.replace(f"{msname}.UVF", fitsidiname))
+
+            os.replace(f"{a_lisfile}~", a_lisfile)
 
     exp.correlator_passes = passes
     return True
@@ -98,43 +110,10 @@ def getdata(exp) -> bool:
     """Gets the data into eee from all existing .lis files from the given experiment.
     inputs: exp : experiment.Experiment
     """
-    for a_pass in exp.correlator_passes:
-        cmd, _ = environment.shell_command("getdata.pl",
-                                           ["-proj", exp.eEVNname if exp.eEVNname is not None \
-                                                                  else exp.expname,
-                                            "-lis", a_pass.lisfile.name],
-                                           shell=True, stdout=None,
-                                           stderr=subprocess.STDOUT, bufsize=0)
-        exp.log(cmd)
-
-    return True
-
-
-def _j2ms2_correlator_pass(args) -> bool:
-    exp, a_pass = args
-    with open(a_pass.lisfile) as f:
-        outms = [a for a in f.readline().replace('\n', '').split(' ')
-                 if (('.ms' in a) and ('.UVF' not in a))][0]
-        a_pass.msfile = outms
-
-    if not os.path.isdir(outms):
-        if 'j2ms2' in exp.special_params:
-            cmd, _ = environment.shell_command("j2ms2", ["-v", a_pass.lisfile.name,
-                                                         *exp.special_params['j2ms2']],
-                                               shell=True, stdout=None,
-                                               stderr=subprocess.STDOUT, bufsize=0)
-        else:
-            if exp.eEVNname is None:
-                cmd, _ = environment.shell_command("j2ms2", ["-v", a_pass.lisfile.name,
-                                                             "fo:nosquash_source_table"],
-                                                   shell=True, stdout=None,
-                                                   stderr=subprocess.STDOUT, bufsize=0)
-            else:
-                cmd, _ = environment.shell_command("j2ms2", ["-v", a_pass.lisfile.name],
-                                                   shell=True, stdout=None,
-                                                   stderr=subprocess.STDOUT, bufsize=0)
-
-        exp.log(cmd, timestamp=True)
+    # All passes are retrieved at the same time, each output is logged once it finishes
+    environment.shell_commands([("getdata.pl", ["-proj", exp.ccsname, "-lis", a_pass.lisfile.name])
+                                for a_pass in exp.correlator_passes],
+                               stderr=subprocess.STDOUT, exp=exp)
 
     return True
 
@@ -151,12 +130,21 @@ def j2ms2(exp) -> bool:
                "the MS file[/bold red]")
         raise IOError("Not enough disk space to create the MS file.")
 
-    # Creating a pool to produce the MS files in parallel
-    # rprint(f"[yellow]Number of correlator passes to j2ms2: {len(exp.correlator_passes)}[/yellow]")
-    with ProcessPoolExecutor(max_workers=6) as pool:
-        results = pool.map(_j2ms2_correlator_pass, product([exp,], exp.correlator_passes))
+    if 'j2ms2' in exp.special_params:
+        j2ms2_params = exp.special_params['j2ms2']
+    elif exp.eEVNname is None:
+        j2ms2_params = ["fo:nosquash_source_table"]
+    else:
+        j2ms2_params = []
 
-    return all(results)
+    # The MS files are produced in parallel (the ones that do not exist yet, as read from
+    # the lis files in get_passes_from_lisfiles)
+    environment.shell_commands([("j2ms2", ["-v", a_pass.lisfile.name, *j2ms2_params])
+                                for a_pass in exp.correlator_passes
+                                if not a_pass.msfile.is_dir()],
+                               max_concurrency=6, stderr=subprocess.STDOUT, exp=exp)
+
+    return True
 
 
 def update_ms_expname(exp) -> bool:
@@ -185,19 +173,26 @@ def standardplots(exp, do_weights=True) -> bool:
     # To run for all correlator passes that will be pipelined.
     # Then once all of them finish, open the plots and ask user.
     calsources = ','.join(exp.sources_stdplot)
+    # The same for all passes if the reference antenna(s) have been set
+    if len(exp.refant) > 0:
+        exp_refant = exp.refant[0] if len(exp.refant) == 1 else f"'{'|'.join(exp.refant)}'"
+    else:
+        exp_refant = None
+
     counter = 0
     for a_pass in exp.correlator_passes:
         try:
             if a_pass.pipeline:
-                if exp.refant is not None:
-                    refant = exp.refant[0] if len(exp.refant) == 1 else f"'{'|'.join(exp.refant)}'"
+                if exp_refant is not None:
+                    refant = exp_refant
                 else:
                     for ant in ('Ef', 'O8', 'Ys', 'Mc', 'Gb', 'At', 'Pt'):
                         if (ant in a_pass.antennas) and (a_pass.antennas[ant].observed):
                             refant = ant
                             break
-                    raise ValueError("Couldn't find a good reference antenna for standardplots. "
-                                     "Please specify it manually.")
+                    else:
+                        raise ValueError("Couldn't find a good reference antenna for "
+                                         "standardplots. Please specify it manually.")
                 counter += 1
                 if (counter == 1) and do_weights:
                     cmd, _ = environment.shell_command("standardplots",
@@ -236,10 +231,11 @@ def print_exp(exp) -> Optional[bool]:
 def open_standardplot_files(exp) -> Optional[bool]:
     """Calls gv to open all plots generated by standardplots.
     """
-    standardplots = []
-    for plot_type in ('weight', 'auto', 'cross', 'ampphase'):
-        standardplots += glob.glob(f"{exp.expname.lower()}*{plot_type}*.ps")
-    # standardplots = glob.glob(f"{exp.expname.lower()}*.ps")
+    # The directory is listed once and the plots are then sorted by type
+    plots = environment.local_files(exp.expname_lower, '.ps')
+    standardplots = [a_plot for plot_type in ('weight', 'auto', 'cross', 'ampphase')
+                     for a_plot in plots
+                     if plot_type in a_plot[len(exp.expname_lower):-len('.ps')]]
 
     if len(standardplots) == 0:
         raise FileNotFoundError(f"Standardplots for {exp.expname} not found but expected.")
@@ -253,8 +249,9 @@ def open_standardplot_files(exp) -> Optional[bool]:
         return None
 
     try:
+        # All plots are opened at once, instead of waiting for each window to be closed
         for a_plot in standardplots:
-            environment.shell_command("gv", a_plot, stdout=None, stderr=subprocess.STDOUT)
+            environment.shell_command_nowait("gv", a_plot)
     except Exception as e:
         print(f"WARNING: Plots could not be opened. Do it manually.\nError: {e}.")
         return None
@@ -262,16 +259,24 @@ def open_standardplot_files(exp) -> Optional[bool]:
     return True
 
 
+def _unique_msfiles(exp) -> list[str]:
+    """Returns the names of the MS files of all correlator passes, in order and each one only
+    once (several passes can point to the same MS file). The MS files are then modified in
+    parallel, and two processes must not write into the same MS at the same time.
+    """
+    return list(dict.fromkeys(a_pass.msfile.name for a_pass in exp.correlator_passes))
+
+
 def onebit(exp) -> bool:
     """In case some stations recorded at 1 bit, scales 1-bit data to correct for
     quantization losses in all MS associated with the given experiment name.
     """
     # Sanity check
     if len(exp.antennas.onebit) > 0:
-        for a_pass in exp.correlator_passes:
-            environment.shell_command("scale1bit.py",
-                                      [a_pass.msfile.name, ' '.join(exp.antennas.onebit)],
-                                      shell=True, stdout=None, stderr=subprocess.STDOUT)
+        onebit_ants = ' '.join(exp.antennas.onebit)
+        environment.shell_commands([("scale1bit.py", [msfile, onebit_ants])
+                                    for msfile in _unique_msfiles(exp)],
+                                   stderr=subprocess.STDOUT, exp=exp)
     elif environment.station_1bit_in_vix(exp.vix):
         print(f"\n\n{'#'*10}\n#Traces of 1bit station found in {exp.vix} "
               "but no station specified to be corrected.\n\n")
@@ -280,12 +285,11 @@ def onebit(exp) -> bool:
 
 
 def ysfocus(exp) -> bool:
-    if ('Ys' not in exp.antennas.names) and ('Ho' not in exp.antennas.names) and ('Hb' not in exp.antennas.names):
+    if all(ant not in exp.antennas for ant in ('Ys', 'Ho', 'Hb')):
         return True
 
-    for a_pass in exp.correlator_passes:
-        environment.shell_command("ysfocus.py", a_pass.msfile.name, stdout=None,
-                                  shell=True, stderr=subprocess.STDOUT)
+    environment.shell_commands([("ysfocus.py", msfile) for msfile in _unique_msfiles(exp)],
+                               stderr=subprocess.STDOUT, exp=exp)
     return True
 
 
@@ -294,25 +298,33 @@ def polswap(exp) -> bool:
     to the given experiment.
     """
     if len(exp.antennas.polswap) > 0:
-        for a_pass in exp.correlator_passes:
-            environment.shell_command("polswap.py",
-                                      [a_pass.msfile.name, ','.join(exp.antennas.polswap)],
-                                      shell=True, stdout=None, stderr=subprocess.STDOUT)
+        polswap_ants = ','.join(exp.antennas.polswap)
+        environment.shell_commands([("polswap.py", [msfile, polswap_ants])
+                                    for msfile in _unique_msfiles(exp)],
+                                   stderr=subprocess.STDOUT, exp=exp)
     return True
 
 
 def flag_weights(exp) -> bool:
+    # Each MS is flagged once, with the threshold of the first pass using it
+    thresholds: dict[str, float] = {}
     for a_pass in exp.correlator_passes:
-        cmd, output = environment.shell_command("flag_weights.py",
-                                    [a_pass.msfile.name, str(a_pass.flagged_weights.threshold)],
-                                    shell=True, stdout=None, stderr=subprocess.STDOUT)
+        thresholds.setdefault(a_pass.msfile.name, a_pass.flagged_weights.threshold)
+
+    outputs = environment.shell_commands([("flag_weights.py", [msfile, str(threshold)])
+                                          for msfile, threshold in thresholds.items()],
+                                         stderr=subprocess.STDOUT)
+    percentages: dict[str, float] = {}
+    for msfile, (cmd, output) in zip(thresholds, outputs):
         exp.log(cmd+"\n# "+output.split('\r')[-1].replace('\n', '\n# ')+"\n")
         # Find the percentage of flagged data and stores it in exp
-        str_end = '% data with non-zero'
-        str_start = 'execution).'
-        if '% data with non-zero weights' in output:
-            a_pass.flagged_weights.percentage = float(output[output.find(str_start) +
-                                                      len(str_start):output.find(str_end)])
+        if (match := _FLAGGED_RE.search(output)) is not None:
+            percentages[msfile] = float(match['percentage'])
+
+    for a_pass in exp.correlator_passes:
+        if a_pass.msfile.name in percentages:
+            a_pass.flagged_weights.percentage = percentages[a_pass.msfile.name]
+
     return True
 
 
@@ -331,12 +343,17 @@ def update_piletter(exp) -> bool:
         weightthreshold = float(exp.correlator_passes[0].flagged_weights.threshold)
         flaggeddata = float(exp.correlator_passes[0].flagged_weights.percentage)
 
-    polconvert_written = subprocess.call(["grep", "Martí-Vidal,",
-                                          f"{exp.expname.lower()}.piletter"],
-                                         shell=False, stdout=subprocess.PIPE) == 0
-    with open(f"{exp.expname.lower()}.piletter", 'r') as orifile:
-        with open(f"{exp.expname.lower()}.piletter~", 'w') as destfile:
-            for a_line in orifile.readlines():
+    # The markers of the antennas that could not observe, and their replacements
+    not_observed = [(f"{ant.name.capitalize()}:", f"{ant.name.capitalize()}: Could not observe.")
+                    for ant in exp.correlator_passes[0].antennas if not ant.observed]
+    with open(f"{exp.expname_lower}.piletter", 'r') as orifile:
+        piletter_lines = orifile.readlines()
+        # If the letter was already updated (no need to grep it in a separate process)
+        polconvert_written = any('Martí-Vidal,' in a_line for a_line in piletter_lines)
+        # The new letter is written at once, in a single call
+        new_lines: list[str] = []
+        with open(f"{exp.expname_lower}.piletter~", 'w') as destfile:
+            for a_line in piletter_lines:
                 tmp_line = a_line
                 if ('derived from the following EVN project code(s):' in tmp_line) and \
                    (exp.expname[-1].isalpha()):
@@ -349,22 +366,21 @@ def update_piletter(exp) -> bool:
                     if '***percent flagged***' in tmp_line:
                         tmp_line = tmp_line.replace('***percent flagged***', f"{flaggeddata:.2}")
 
-                    for ant in exp.correlator_passes[0].antennas:
-                        if (f"{ant.name.capitalize()}:" in tmp_line) and (not ant.observed):
-                            tmp_line = tmp_line.replace(f"{ant.name.capitalize()}:",
-                                                    f"{ant.name.capitalize()}: Could not observe.")
+                    for ant_marker, ant_replacement in not_observed:
+                        if ant_marker in tmp_line:
+                            tmp_line = tmp_line.replace(ant_marker, ant_replacement)
 
-                    destfile.write(tmp_line)
+                    new_lines.append(tmp_line)
                     if ('Further remarks:' in tmp_line) and (not polconvert_written):
                         if len(exp.antennas.polconvert) > 0:
-                            destfile.write("\n")
+                            new_lines.append("\n")
                             if len(exp.antennas.polconvert) > 1:
                                 s = f"s {', '.join(exp.antennas.polconvert[:-1])} and " \
                                     f"{exp.antennas.polconvert[-1]} "
                             else:
                                 s = f" {exp.antennas.polconvert[0]} "
 
-                            destfile.write(f"- Note that the antenna{s}originally observed linear "
+                            new_lines.append(f"- Note that the antenna{s}originally observed linear "
                                            "polarizations, which were transformed to circular "
                                            "ones during post-processing via the PolConvert "
                                            "program (Martí-Vidal, et al. 2016, A&A,587, A143). "
@@ -423,7 +439,7 @@ def update_piletter(exp) -> bool:
                                     s += f"{', '.join(ants_bw_r[ant_r])} subbands {ant_r}, "
 
                             s += "due to their local bandwidth limitations.\n"
-                            destfile.write(s)
+                            new_lines.append(s)
 
                         s = "- Note that the data from the antenna"
                         s_end = " have been corrected for opacity in the Tsys/Gain Curve " \
@@ -431,20 +447,24 @@ def update_piletter(exp) -> bool:
                         if len(exp.antennas.opacity) > 1:
                             s += f"s {', '.join(exp.antennas.opacity[:-1])} and " \
                                  f"{exp.antennas.opacity[-1]}"
-                            destfile.write(s + s_end)
+                            new_lines.append(s + s_end)
                         elif len(exp.antennas.opacity) == 1:
                             s += f" {exp.antennas.opacity[0]}"
-                            destfile.write(s + s_end)
+                            new_lines.append(s + s_end)
+
+            destfile.write(''.join(new_lines))
 
-    os.rename(f"{exp.expname.lower()}.piletter~", f"{exp.expname.lower()}.piletter")
+    os.replace(f"{exp.expname_lower}.piletter~", f"{exp.expname_lower}.piletter")
     return True
 
 
 def tconvert(exp) -> bool:
     """Runs tConvert in all MS files available in the directory
     """
+    # The directory is listed once for all passes
+    local_files = environment.local_files()
     for a_pass in exp.correlator_passes:
-        if len(glob.glob(f"{a_pass.fitsidifile}*")) > 0:
+        if any(a_file.startswith(a_pass.fitsidifile) for a_file in local_files):
             continue
 
         # The size difference between internal MS and FITS-IDI is around 1.55
@@ -480,26 +500,26 @@ def polconvert(exp) -> Optional[bool]:
         polconv_inp = Path('./polconvert_inputs.toml')
         if not polconv_inp.exists():
             exp.log("cp ~/polconvert/polconvert_inputs.toml ./polconvert_inputs.toml")
-            environment.shell_command('cp', ['/home/jops/polconvert/polconvert_inputs.toml',
-                                      './polconvert_inputs.toml'], shell=True, stdout=None)
+            shutil.copyfile('/home/jops/polconvert/polconvert_inputs.toml', polconv_inp)
 
             with open(polconv_inp, 'r') as pcfile:
                 pccontent = pcfile.read()
 
-            pccontent.replace("expname_1_1.IDI*", f"{exp.expname.lower()}_1_1.IDI*")
+            pccontent.replace("expname_1_1.IDI*", f"{exp.expname_lower}_1_1.IDI*")
             pccontent.replace("'T6'", ', '.join([f"'{ant.upper()}'" for ant in \
                               exp.antennas.polconvert]))
             pccontent.replace("'EF'", f"'{exp.refant[0].upper()}'")
 
             excl_ants = []
+            pconv_ants = exp.antennas.polconvert
             for ant in exp.antennas:
-                if (ant.name != exp.refant[0]) and (ant not in exp.antennas.polconvert):
+                if (ant.name != exp.refant[0]) and (ant.name not in pconv_ants):
                     if (not ant.observed):
                         excl_ants.append(ant.name.upper())
 
                     # I exclude all antennas that did not observe all subbands as the antenas
                     # to PolConvert
-                    for pant in exp.antennas.polconvert:
+                    for pant in pconv_ants:
                         if not set(exp.antennas[pant].subbands).issubset(set(ant.subbands)):
                             excl_ants.append(ant.name.upper())
 
@@ -572,7 +592,7 @@ def post_polconvert(exp) -> Optional[bool]:
             refant = exp.refant[0] if len(exp.refant) == 1 else f"({'|'.join(exp.refant)})"
         else:
             for ant in ('EF', 'O8', 'YS', 'MC', 'GB', 'AT', 'PT'):
-                if (ant in exp.antennas.names) and (exp.antennas[ant].observed):
+                if (ant in exp.antennas) and (exp.antennas[ant].observed):
                     refant = ant
                     break
             raise ValueError("Could not find a good reference antenna for standardplots. "
@@ -583,8 +603,8 @@ def post_polconvert(exp) -> Optional[bool]:
                            refant, ','.join(exp.sources_stdplot)], stdout=None,
                            stderr=subprocess.STDOUT)
 
-        for a_plot in glob.glob(f"{exp.expname.lower()}-*-pconv-cross*.ps"):
-            environment.shell_command("gv", a_plot, stdout=None, stderr=subprocess.STDOUT)
+        for a_plot in glob.glob(f"{exp.expname_lower}-*-pconv-cross*.ps"):
+            environment.shell_command_nowait("gv", a_plot)
 
     exp.last_step = 'post_polconvert'
     rprint("\n\n[bold green]If PolConvert worked fine, re-run me to continue. " \
@@ -607,27 +627,38 @@ def post_post_polconvert(exp) -> bool:
     return True
 
 
+def _auth_files(local_files: Optional[list[str]] = None) -> list[str]:
+    """Returns the .auth files (named as {username}_{password}.auth) in the current directory,
+    or among the given file names (if already listed).
+    """
+    if local_files is None:
+        local_files = environment.local_files(suffix='.auth')
+
+    return [a_file for a_file in local_files
+            if a_file.endswith('.auth') and ('_' in a_file[:-len('.auth')])]
+
+
 def set_credentials(exp) -> bool:
     """Sets the credentials for the given experiment.
     In case of an NME or test, it does not set any credential.
     Otherwise, it will take the credentials from a .auth file if already exists,
     or creates such file iwth a new password.
     """
-    if (exp.expname.upper()[0] == 'N') or (exp.expname.upper()[0] == 'F'):
+    if exp.expname[0] in ('N', 'F'):  # expname is always upper case
         rprint(f"\n[green][bold]NOTE:[/bold] {exp.expname} is an NME or test experiment.\n"
                "No authentification will be set.[/green]")
-    elif len(glob.glob("*_*.auth")) == 1:
+    elif len(authfiles := _auth_files()) == 1:
         # Some credentials are already in place.
-        exp.set_credentials(*glob.glob("*_*.auth")[0].split('.')[0].split('_'))
+        exp.set_credentials(*authfiles[0].split('.')[0].split('_'))
 
-    elif len(glob.glob("*_*.auth")) > 1:
+    elif len(authfiles) > 1:
         raise ValueError("More than one .auth file found in the directory.")
     else:
+        # Only alphanumeric characters, as '_' separates username and password in the .auth file
         possible_char = string.digits + string.ascii_letters
-        exp.set_credentials(username=exp.expname.lower(),
-                            password="".join(random.sample(possible_char, 12)))
-        environment.shell_command("touch",
-                                  f"{exp.credentials.username}_{exp.credentials.password}.auth")
+        exp.set_credentials(username=exp.expname_lower,
+                            password="".join(secrets.choice(possible_char) for _ in range(12)))
+        Path(f"{exp.credentials.username}_{exp.credentials.password}.auth").touch()
         exp.log(f"touch {exp.credentials.username}_{exp.credentials.password}.auth")
 
     return True
@@ -639,26 +670,51 @@ def create_pipelet(exp) -> bool:
     not create any file.
     If the file exists, it will be overwritten.
     """
-    environment.shell_command("pipelet.py", [exp.expname.lower(), exp.supsci.lower()])
-    exp.log(f"pipelet.py {exp.expname.lower()} {exp.supsci.lower()}")
+    environment.shell_command("pipelet.py", [exp.expname_lower, exp.supsci.lower()])
+    exp.log(f"pipelet.py {exp.expname_lower} {exp.supsci.lower()}")
     return True
 
 
 def archive(exp) -> bool:
+    # The directory is listed once for all the checks below
+    local_files = environment.local_files()
+    psfiles = [a_file for a_file in local_files if a_file.endswith('.ps')]
+    compressing = None
     # Compress all figures from standardplots if they haven't been yet
-    if len(glob.glob("*.ps")) > 0:
+    if len(psfiles) > 0:
         # This avoids issues as it seems like gzip freezes when overwriting the same files
-        if len(glob.glob("*.ps.gz")) > 0:
-            environment.shell_command("rm -rf", "*ps.gz", shell=True)
-
-        environment.shell_command("gzip", "*ps", shell=True)
-        exp.log('gzip *ps')
+        for a_file in local_files:
+            if a_file.endswith('ps.gz'):
+                os.remove(a_file)
+
+        # Compressed in parallel: pigz uses all cores, otherwise one gzip process per file.
+        # pigz runs in the background while the authentication is archived.
+        if shutil.which('pigz') is not None:
+            # Its errors are kept to report them once it finishes
+            cmd, compressing = environment.shell_command_nowait("pigz", psfiles,
+                                                                stderr=subprocess.PIPE)
+            exp.log(cmd)
+        else:
+            environment.shell_commands([("gzip", a_file) for a_file in psfiles],
+                                       max_concurrency=os.cpu_count() or 1)
+            exp.log('gzip *ps')
 
-    if (exp.credentials.username is not None) and (exp.credentials.password is not None):
-        environment.archive("-auth", exp,
-                            f"-n {exp.credentials.username} -p {exp.credentials.password}")
-    else:
-        assert len(glob.glob("*_*.auth")) == 0, 'No credentials stored but auth file found'
+    try:
+        if (exp.credentials.username is not None) and (exp.credentials.password is not None):
+            environment.archive("-auth", exp,
+                                f"-n {exp.credentials.username} -p {exp.credentials.password}")
+        else:
+            assert len(_auth_files(local_files)) == 0, 'No credentials stored but auth file found'
+    finally:
+        # pigz is always waited for, even if archiving the credentials failed
+        if compressing is not None:
+            _, errors = compressing.communicate()
+            exp.log(f"# pigz finished with return code {compressing.returncode}")
+            for a_line in errors.decode('utf-8').splitlines():
+                exp.log(f"# {a_line}")
+
+    if (compressing is not None) and (compressing.returncode != 0):
+        raise ValueError(f"Error code {compressing.returncode} when compressing the standardplots.")
 
     environment.archive("-stnd", exp, "*ps.gz")
     environment.archive("-fits", exp, "*IDI*")
@@ -672,13 +728,14 @@ def append_antab(exp) -> bool:
     If the ANTAB file is already present in the directory, it will assume that the information
     was already appended.
     """
-    fits2check = glob.glob(f"{exp.expname.lower()}_*_*.IDI1") + \
-                 glob.glob(f"{exp.expname.lower()}_*_*.IDI")
+    from evn_support import check_antab_idi
+    fits2check = glob.glob(f"{exp.expname_lower}_*_*.IDI1") + \
+                 glob.glob(f"{exp.expname_lower}_*_*.IDI")
     assert len(fits2check) > 0, "Could not find FITS-IDI to append Tsys/GC!"
 
     if (not all([check_antab_idi.check_consistency(a_fits, verbose=False) \
                  for a_fits in fits2check])) \
-                 or (len(glob.glob(f"{exp.expname.lower()}*.antab")) == 0):
+                 or (not environment.local_files_exist(exp.expname_lower, '.antab')):
         environment.shell_command("append_antab_idi.py", "-r", shell=True, stdout=None)
         exp.log('append_antab_idi.py')
         if not all([check_antab_idi.check_consistency(a_fits) for a_fits in fits2check]):
@@ -688,7 +745,7 @@ def append_antab(exp) -> bool:
     else:
         rprint("[green]ANTAB information already appended into the FITS-IDI files.[/green]")
 
-    environment.archive("-fits", exp, f"{exp.expname.lower()}_*_*.IDI*")
+    environment.archive("-fits", exp, f"{exp.expname_lower}_*_*.IDI*")
     return True
 
 
@@ -696,7 +753,7 @@ def send_letters(exp) -> bool:
     """Remembers you to update the PI letter and send it , and the pipeletter, to the PIs.
     Finally, it runs parsePIletter.
     """
-    environment.archive("-stnd", exp, f"{exp.expname.lower()}.piletter")
+    environment.archive("-stnd", exp, f"{exp.expname_lower}.piletter")
     print("\n\n\n")
     rprint("[center][bold red] --- Send the PI letter --- [/bold red][/center]")
     pi = "\n"
@@ -706,7 +763,7 @@ def send_letters(exp) -> bool:
     else:
         pi += f"{exp.piname.capitalize()}: {exp.email}\n"
 
-    rprint(f"[green]Send the file [bold]{exp.expname.lower()}.piletter"
+    rprint(f"[green]Send the file [bold]{exp.expname_lower}.piletter"
            f"{'_auth' if exp.credentials.password is not None else ''}[/bold] to " + pi + \
            "and CCing jops@jive.eu.[/green]")
     return True
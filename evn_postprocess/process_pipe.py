@@ -4,7 +4,6 @@ It runs all steps although it requires user interaction to
 verify that all steps have been performed correctly and/or
 perform required changes in intermediate files.
 """
-import glob
 from typing import Optional
 from rich import print as rprint
 from . import experiment
@@ -15,15 +14,15 @@ def create_folders(exp) -> bool:
     """Creates the folder required for the post-processing of the experiment
     @eee:/data0/{exp.supsci}/{exp.upper()}
     """
-    dirs = [f"/data/pipe/{exp.expname.lower()}/in",
-            f"/data/pipe/{exp.expname.lower()}/out"]
+    dirs = [f"/data/pipe/{exp.expname_lower}/in",
+            f"/data/pipe/{exp.expname_lower}/out"]
     if (exp.eEVNname is None) or (exp.eEVNname == exp.expname):
-        dirs.append(f"/data/pipe/{exp.expname.lower()}/temp")
+        dirs.append(f"/data/pipe/{exp.expname_lower}/temp")
 
-    for a_dir in dirs:
-        if not env.remote_file_exists('jops@archive.jive.eu', a_dir):
-            env.ssh('jops@archive.jive.eu', f"mkdir -p {a_dir}")
-            exp.log(f"mkdir -p {a_dir}")
+    # A single ssh call: mkdir -p already skips the existing ones, and -v reports the created ones
+    _, output = env.ssh('jops@archive.jive.eu', f"mkdir -pv {' '.join(dirs)}")
+    if (output is not None) and (output.strip() != ''):
+        exp.log(f"mkdir -p {' '.join(dirs)}")
 
     return True
 
@@ -31,34 +30,33 @@ def create_folders(exp) -> bool:
 def get_files_from_vlbeer(exp) -> bool:
     """Retrieves the antabfs, log, and flag files that should be in vlbeer for the given experiment.
     """
-    cd = f"cd /data/pipe/{exp.expname.lower()}/temp"
+    cd = f"cd /data/pipe/{exp.expname_lower}/temp"
 
     def scp(exp, ext: str):
         return "scp evn@vlbeer.ira.inaf.it:vlbi_arch/" \
-               f"{exp.obsdatetime.strftime('%b%y').lower()}/{exp.expname.lower()}" + \
+               f"{exp.obsdatetime.strftime('%b%y').lower()}/{exp.expname_lower}" + \
                r"\*" + f".{ext} ."
 
 
 
-    cmd, output = env.ssh('jops@archive.jive.eu', ';'.join([cd, scp(exp, 'flag')]))
+    # All files are retrieved and listed within a single ssh connection
+    cmd, output = env.ssh('jops@archive.jive.eu',
+                          ';'.join([cd, *[scp(exp, ext) for ext in ('flag', 'log', 'antabfs')],
+                                    f"ls {exp.expname_lower}*log {exp.expname_lower}*antabfs"]))
     exp.log(cmd)
-    for ext in ('log', 'antabfs'):
-        cmd, output = env.ssh('jops@archive.jive.eu', ';'.join([cd, scp(exp, ext)]))
-        exp.log(cmd)
-        cmd, output = env.ssh('jops@archive.jive.eu', ';'.join([cd, f"ls {exp.expname.lower()}*{ext}"]))
-        the_files = [o for o in output.split('\n') if o != '']  # just to avoid trailing \n
-        for a_file in the_files:
-            ant = a_file.split('.')[0].replace(exp.expname.lower(), '').capitalize()
-            try:
-                if ext == 'log':
-                    exp.antennas[ant].logfsfile = True
-                elif ext == 'antabfs':
-                    exp.antennas[ant].antabfsfile = True
-            except ValueError:
-                # Likely the antenna has a different name in the expsum, or is an e-EVN
-                # where this antenna participated but not in this particular experiment
-                rprint(f"[yellow]The antenna '{ant}' has a log file but is not found in " \
-                       "the .expsum file. Just ignoring this and continuing...[/yellow]")
+    the_files = [o for o in output.split('\n') if o != '']  # just to avoid trailing \n
+    for a_file in the_files:
+        ant = a_file.split('.')[0].replace(exp.expname_lower, '').capitalize()
+        try:
+            if a_file.endswith('log'):
+                exp.antennas[ant].logfsfile = True
+            elif a_file.endswith('antabfs'):
+                exp.antennas[ant].antabfsfile = True
+        except ValueError:
+            # Likely the antenna has a different name in the expsum, or is an e-EVN
+            # where this antenna participated but not in this particular experiment
+            rprint(f"[yellow]The antenna '{ant}' has a log file but is not found in " \
+                   "the .expsum file. Just ignoring this and continuing...[/yellow]")
 
 
     exp.log(f"\n# Log files found for:\n# {', '.join(exp.antennas.logfsfile)}")
@@ -78,14 +76,14 @@ def get_files_from_vlbeer(exp) -> bool:
     # In case of high-freq observations, some stations added the "opacity_corrected" flag to
     #the POLY= line, against any standard... Let's remove it so antab_editor (later) can work fine.
     cmd, output = env.ssh('jops@archive.jive.eu',
-        f"grep -l ',opacity_corrected' /data/pipe/{exp.expname.lower()}/temp/{exp.expname.lower()}*.antabfs")
+        f"grep -l ',opacity_corrected' /data/pipe/{exp.expname_lower}/temp/{exp.expname_lower}*.antabfs")
     the_files = [o for o in output.split('\n') if o != '']  # just to avoid trailing \n
     for a_file in the_files:
         cmd, _ = env.ssh('jops@archive.jive.eu', f"sed -i 's/,opacity_corrected//g' " \
-                         f"/data/pipe/{exp.expname.lower()}/temp/{a_file}", \
+                         f"/data/pipe/{exp.expname_lower}/temp/{a_file}", \
                          shell=False)
         exp.log(cmd)
-        antenna = a_file.split('/')[-1].replace('.antabfs', '').replace(exp.expname.lower(), \
+        antenna = a_file.split('/')[-1].replace('.antabfs', '').replace(exp.expname_lower, \
                   '').capitalize()
         exp.antennas[antenna].opacity = True
     return True
@@ -95,16 +93,16 @@ def get_vlba_antab(exp) -> Optional[bool]:
     """Retrieves the cal (antab) files from VLBA if needed, and copies the VLBA gains, into the archive temp folder
     for the given experiment.
     """
-    if exp.expname.lower()[0] != 'g':
+    if exp.expname_lower[0] != 'g':
         return True
 
-    cd = f"cd /data/pipe/{exp.expname.lower()}/temp/"
+    cd = f"cd /data/pipe/{exp.expname_lower}/temp/"
 
     cmd, _ = env.ssh('jops@archive.jive.eu', ';'.join([cd, "scp jops@eee:/data0/tsys/vlba_gains.key ."]))
     exp.log(cmd)
     cmd, _ = env.ssh('jops@archive.jive.eu', ';'.join([cd, "scp jops@ccs:/ccs/var/log2vex/logexp_date/" \
                                                       f"{exp.expname.upper()}_{exp.obsdatetime.strftime('%Y%m%d')}" \
-                                                      f"/{exp.expname.lower()}cal.vlba ."]))
+                                                      f"/{exp.expname_lower}cal.vlba ."]))
     exp.log(cmd)
     return True
 
@@ -122,15 +120,15 @@ def get_vlba_antab(exp) -> Optional[bool]:
 def run_antab_editor(exp) -> Optional[bool]:
     """Opens antab_editor.py for the given experiment.
     """
-    cd = f"cd /data/pipe/{exp.expname.lower()}/temp"
-    cdinp = f"/data/pipe/{exp.expname.lower()}/in"
-    cdtemp = f"/data/pipe/{exp.expname.lower() if exp.eEVNname is None else exp.eEVNname.lower()}/temp"
-    if env.remote_file_exists('jops@archive.jive.eu', f"{cdinp}/{exp.expname.lower()}*.antab"):
+    cd = f"cd /data/pipe/{exp.expname_lower}/temp"
+    cdinp = f"/data/pipe/{exp.expname_lower}/in"
+    cdtemp = f"/data/pipe/{exp.ccsname.lower()}/temp"
+    if env.remote_file_exists('jops@archive.jive.eu', f"{cdinp}/{exp.expname_lower}*.antab"):
         print("Antab file already found in {cdinp}.")
         return True
 
     if env.remote_file_exists('jops@archive.jive.eu', f"{cdtemp}/" \
-            f"{exp.expname.lower() if exp.eEVNname is None else exp.eEVNname.lower()}*.antab"):
+            f"{exp.ccsname.lower()}*.antab"):
         print("Copying Antab file from {cdtemp} to {cdinp}.")
         cmd, _ = env.ssh('jops@archive.jive.eu', f"cp {cdtemp}/*.antab {cdinp}/")
         exp.log(cmd)
@@ -139,7 +137,7 @@ def run_antab_editor(exp) -> Optional[bool]:
             for an_antab in env.ssh('jops@archive.jive.eu', f"ls {cdinp}/*.antab")[1].split('\n'):
                 if an_antab != '':
                     env.ssh('jops@archive.jive.eu', f"mv {an_antab} "
-                f"{'/'.join([*an_antab.split('/')[:-1], an_antab.split('/')[-1].replace(exp.eEVNname.lower(), exp.expname.lower())])}")
+                f"{'/'.join([*an_antab.split('/')[:-1], an_antab.split('/')[-1].replace(exp.eEVNname.lower(), exp.expname_lower)])}")
         return True
 
     if exp.eEVNname is not None:
@@ -149,7 +147,7 @@ def run_antab_editor(exp) -> Optional[bool]:
         # I fake it to be sucessful in the object to let it run seemless in a following iteraction
         return None
 
-    if '_line' in ''.join(glob.glob(f"{exp.expname.lower()}*.lis")):
+    if any('_line' in a_lis for a_lis in env.local_files(exp.expname_lower, '.lis')):
         cmd, _ = env.ssh('-Y '+'jops@archive.jive.eu', ';'.join([cd, 'antab_editor.py -l']))
         rprint('\n\n\n[bold red]Run `antab_editor.py -l` manually in pipe.[/bold red]')
     else:
@@ -167,13 +165,13 @@ def run_antab_editor(exp) -> Optional[bool]:
 def create_uvflg(exp) -> Optional[bool]:
     """Produces the combined uvflg file containing the full flagging from all telescopes.
     """
-    cdinp = f"/data/pipe/{exp.expname.lower()}/in"
-    if env.remote_file_exists('jops@archive.jive.eu', f"{cdinp}/{exp.expname.lower()}*.uvflg"):
+    cdinp = f"/data/pipe/{exp.expname_lower}/in"
+    if env.remote_file_exists('jops@archive.jive.eu', f"{cdinp}/{exp.expname_lower}*.uvflg"):
         return True
 
     if (exp.eEVNname is None) or (exp.expname == exp.eEVNname):
-        cd = f"cd /data/pipe/{exp.expname.lower()}/temp"
-        if not env.remote_file_exists('jops@archive.jive.eu', f"{cd}/{exp.expname.lower()}.uvflg"):
+        cd = f"cd /data/pipe/{exp.expname_lower}/temp"
+        if not env.remote_file_exists('jops@archive.jive.eu', f"{cd}/{exp.expname_lower}.uvflg"):
             # cmd, output = env.ssh('jops@archive.jive.eu',
             #                       '"'+';'.join([cd, '/home/jops/opt/evn_support/uvflgall.sh'])+'"')
             cmd, output = env.ssh('jops@archive.jive.eu',
@@ -187,7 +185,7 @@ def create_uvflg(exp) -> Optional[bool]:
 
             exp.log(cmd + '\n# ' + ',\n'.join(output_tail[::-1]).replace('\n', '\n# '))
             cmd, _ = env.ssh('jops@archive.jive.eu', ';'.join([cd, \
-                             f"cat *uvflgfs > {exp.expname.lower()}.uvflg"]))
+                             f"cat *uvflgfs > {exp.expname_lower}.uvflg"]))
             exp.log(cmd)
     else:
         cd = f"/data/pipe/{exp.eEVNname.lower()}/temp"
@@ -198,16 +196,17 @@ def create_uvflg(exp) -> Optional[bool]:
                   "I will be able to run by myself.")
             return None
 
-    cdinp = f"/data/pipe/{exp.expname.lower()}/in"
+    cdinp = f"/data/pipe/{exp.expname_lower}/in"
     cdtemp = f"/data/pipe/" \
-             f"{exp.expname.lower() if exp.eEVNname is None else exp.eEVNname.lower()}/temp" \
-             f"/{exp.expname.lower() if exp.eEVNname is None else exp.eEVNname.lower()}.uvflg"
-    if len(pipepass := [apass.pipeline for apass in exp.correlator_passes if apass.pipeline]) > 1:
-        for p in range(1, len(pipepass) + 1):
-            cmd, _ = env.ssh('jops@archive.jive.eu', f"cp {cdtemp} {cdinp}/{exp.expname.lower()}_{p}.uvflg")
-            exp.log(cmd)
+             f"{exp.ccsname.lower()}/temp" \
+             f"/{exp.ccsname.lower()}.uvflg"
+    if len(pipepass := exp.pipeline_passes) > 1:
+        # All copies within a single ssh connection
+        cmd, _ = env.ssh('jops@archive.jive.eu', ';'.join([f"cp {cdtemp} {cdinp}/{exp.expname_lower}_{p}.uvflg"
+                                                           for p in range(1, len(pipepass) + 1)]))
+        exp.log(cmd)
     else:
-        cmd, _ = env.ssh('jops@archive.jive.eu', f"cp {cdtemp} {cdinp}/{exp.expname.lower()}.uvflg")
+        cmd, _ = env.ssh('jops@archive.jive.eu', f"cp {cdtemp} {cdinp}/{exp.expname_lower}.uvflg")
         exp.log(cmd)
 
     return True
@@ -218,8 +217,8 @@ def create_input_file(exp) -> bool:
     and modifies the standard parameters.
     """
     # First copies the final uvflg and antab files to the input directory
-    cdinp = f"/data/pipe/{exp.expname.lower()}/in/"
-    if env.remote_file_exists('jops@archive.jive.eu', f"{cdinp}/{exp.expname.lower()}*.inp.txt"):
+    cdinp = f"/data/pipe/{exp.expname_lower}/in/"
+    if env.remote_file_exists('jops@archive.jive.eu', f"{cdinp}/{exp.expname_lower}*.inp.txt"):
         return True
 
     # Parameters to modify inside the input file
@@ -232,18 +231,16 @@ def create_input_file(exp) -> bool:
 
     userno = output.replace('\n', '').strip()
 
-    bpass = [s.name for s in exp.sources if s.type is experiment.SourceType.fringefinder]
-    pcal = [s.name for s in exp.sources if s.type is experiment.SourceType.calibrator]
-    targets = [s.name for s in exp.sources if (s.type is experiment.SourceType.target) or
-                         (s.type is experiment.SourceType.other)]
+    bpass = exp.source_names(experiment.SourceType.fringefinder)
+    pcal = exp.source_names(experiment.SourceType.calibrator)
+    targets = exp.source_names(experiment.SourceType.target, experiment.SourceType.other)
 
 
 
-    to_change = [["experiment = n05c3", f"experiment = {exp.expname.lower()}"],
-                  ["userno = 3602", f"userno = {userno}"],
-                  ["refant = Ef, Mc, Nt", f"refant = {', '.join(exp.refant)}"],
-                  ["plotref = Ef", f"plotref = {', '.join(exp.refant)}"],
-                  ["bpass = 3C345, 3C454.3", f"bpass = {', '.join(bpass)}"]]
+    to_change = [["userno = 3602", f"userno = {userno}"],
+                 ["refant = Ef, Mc, Nt", f"refant = {', '.join(exp.refant)}"],
+                 ["plotref = Ef", f"plotref = {', '.join(exp.refant)}"],
+                 ["bpass = 3C345, 3C454.3", f"bpass = {', '.join(bpass)}"]]
 
     if len(pcal) == 0: # no phase-referencing experiment
         to_change += [["#solint = 0", "solint = 2"]]
@@ -262,44 +259,30 @@ def create_input_file(exp) -> bool:
                       ["target = J2254+1341", f"target = {', '.join(targets)}"]]
 
 
-    pipepasses = [apass for apass in exp.correlator_passes if apass.pipeline]
+    pipepasses = exp.pipeline_passes
     if (len(exp.correlator_passes) > 2) or \
        ((len(exp.correlator_passes) == 2) and (len(pipepasses) > 1)):
-        env.scp(f"{exp.vix}", f"jops@archive.jive.eu:/data/pipe/{exp.expname.lower()}/in/")
+        env.scp(f"{exp.vix}", f"jops@archive.jive.eu:/data/pipe/{exp.expname_lower}/in/")
         to_change += [["#doprimarybeam = 1", "doprimarybeam = 1"],
                       ["#setup_station = Ef", f"setup_station = {exp.refant[0]}"]]
 
-    cmd, _ = env.ssh('jops@archive.jive.eu',
-                  "cp /data/pipe/templates/pipeline.inp.txt " \
-                  "/data/pipe/{0}/in/{0}.inp.txt".format(exp.expname.lower()),
-                  shell=False)
-    exp.log(cmd, False)
-    for a_change in to_change:
-        cmd, _ = env.ssh('jops@archive.jive.eu', f"sed -i 's/{a_change[0]}/{a_change[1]}/g' " \
-                 f"{'/data/pipe/{0}/in/{0}.inp.txt'.format(exp.expname.lower())}", shell=False)
-        exp.log(cmd, False)
-
+    # All substitutions are applied in a single sed pass over the template, instead of
+    # copying it and running one sed (and one ssh connection) per change.
     if len(pipepasses) > 1:
-        cmd, _ = env.ssh('jops@archive.jive.eu',
-                      "mv /data/pipe/{0}/in/{0}.inp.txt "
-                      "/data/pipe/{0}/in/{0}_1.inp.txt".format(exp.expname.lower()))
-        exp.log(cmd, False)
-        a_change = [f"experiment = {exp.expname.lower()}", f"experiment = {exp.expname.lower()}_1"]
-        cmd, _ = env.ssh('jops@archive.jive.eu', f"sed -i 's/{a_change[0]}/{a_change[1]}/g' " \
-                         f"{'/data/pipe/{0}/in/{0}_1.inp.txt'.format(exp.expname.lower())}",
-                         shell=False)
+        inputfiles = {f"{exp.expname_lower}_{i}": f"{cdinp}{exp.expname_lower}_{i}.inp.txt"
+                      for i in range(1, len(pipepasses) + 1)}
+    else:
+        inputfiles = {exp.expname_lower: f"{cdinp}{exp.expname_lower}.inp.txt"}
+
+    for an_expname, inputfile in inputfiles.items():
+        changes = [["experiment = n05c3", f"experiment = {an_expname}"]] + to_change
+        sed_changes = ' '.join([f"-e 's/{a_change[0]}/{a_change[1]}/g'" for a_change in changes])
+        # Written to a temporary file first, so a failed sed does not leave behind an input
+        # file (which would be taken as already created when running again)
+        cmd, _ = env.ssh('jops@archive.jive.eu', f"sed {sed_changes} "
+                         f"/data/pipe/templates/pipeline.inp.txt > {inputfile}.tmp && "
+                         f"mv {inputfile}.tmp {inputfile}", shell=False)
         exp.log(cmd, False)
-        for i in range(2, len(pipepasses) + 1):
-            cmd, _ = env.ssh('jops@archive.jive.eu',
-                          "cp /data/pipe/{0}/in/{0}_1.inp.txt "
-                          "/data/pipe/{0}/in/{0}_{1}.inp.txt".format(exp.expname.lower(), i))
-            exp.log(cmd, False)
-            a_change = [f"experiment = {exp.expname.lower()}_1",
-                        f"experiment = {exp.expname.lower()}_{i}"]
-            cmd, _ = env.ssh('jops@archive.jive.eu', f"sed -i 's/{a_change[0]}/{a_change[1]}/g' " \
-                    f"{'/data/pipe/{0}/in/{0}_{1}.inp.txt'.format(exp.expname.lower(), i)}",
-                     shell=False)
-            exp.log(cmd, False)
 
     return True
 
@@ -308,21 +291,21 @@ def run_pipeline(exp) -> Optional[bool]:
     """Runs the EVN Pipeline
     """
     exp.log('# Running the pipeline...', True)
-    cd = f"cd /data/pipe/{exp.expname.lower()}/in/"
+    cd = f"cd /data/pipe/{exp.expname_lower}/in/"
     rprint('\n\n\n[bold red]Modify the input file for the pipeline and run it manually[/bold red]')
     # TODO:
     exp.last_step = 'pipeline'
     return None
     if len(exp.correlator_passes) > 1:
-        cmd = env.ssh('jops@archive.jive.eu', f"{cd};EVN.py {exp.expname.lower()}_1.inp.txt")
+        cmd = env.ssh('jops@archive.jive.eu', f"{cd};EVN.py {exp.expname_lower}_1.inp.txt")
     else:
-        cmd = env.ssh('jops@archive.jive.eu', f"{cd};EVN.py {exp.expname.lower()}.inp.txt")
+        cmd = env.ssh('jops@archive.jive.eu', f"{cd};EVN.py {exp.expname_lower}.inp.txt")
 
     exp.log(cmd, False)
     exp.log('# Pipeline finished.', True)
     if len(exp.correlator_passes) == 2:
         # TODO: implement line in the normal pipeline
-        cmd = env.ssh('jops@archive.jive.eu', f"{cd};EVN.py {exp.expname.lower()}_2.inp.txt")
+        cmd = env.ssh('jops@archive.jive.eu', f"{cd};EVN.py {exp.expname_lower}_2.inp.txt")
 
     return True
 
@@ -330,32 +313,32 @@ def run_pipeline(exp) -> Optional[bool]:
 def comment_tasav_files(exp) -> bool:
     """Creates the comment and tasav files after the EVN Pipeline has run.
     """
-    cdin = f"/data/pipe/{exp.expname.lower()}/in"
-    cdout = f"/data/pipe/{exp.expname.lower()}/out"
+    cdin = f"/data/pipe/{exp.expname_lower}/in"
+    cdout = f"/data/pipe/{exp.expname_lower}/out"
     path = "/home/jops/opt/evn_support"
     if not (env.remote_file_exists('jops@archive.jive.eu', \
-                                   f"{cdout}/{exp.expname.lower()}" + r"\*.comment") and \
+                                   f"{cdout}/{exp.expname_lower}" + r"\*.comment") and \
             env.remote_file_exists('jops@archive.jive.eu', \
-                                   f"{cdin}/{exp.expname.lower()}" + r"\*.tasav.txt")):
-        pipepasses = [apass for apass in exp.correlator_passes if apass.pipeline]
+                                   f"{cdin}/{exp.expname_lower}" + r"\*.tasav.txt")):
+        pipepasses = exp.pipeline_passes
         if len(pipepasses) > 1:
             for p in range(1, len(pipepasses) + 1):
                 if pipepasses[p-1].freqsetup.channels >= 512:
                     # We assume that it is a spectral line experiment
                     cmd = env.ssh('jops@archive.jive.eu',
-                          f"cd {cdin} && {path}/comment_tasav_file.py --line {exp.expname.lower()}_{p}", stdout=None)
+                          f"cd {cdin} && {path}/comment_tasav_file.py --line {exp.expname_lower}_{p}", stdout=None)
                 else:
                     cmd = env.ssh('jops@archive.jive.eu',
-                                  f"cd {cdin} && {path}/comment_tasav_file.py {exp.expname.lower()}_{p}", stdout=None)
+                                  f"cd {cdin} && {path}/comment_tasav_file.py {exp.expname_lower}_{p}", stdout=None)
 
                 exp.log(cmd)
         else:
             if exp.correlator_passes[0].freqsetup.channels >= 512:
                 cmd = env.ssh('jops@archive.jive.eu',
-                              f"cd {cdin} && {path}/comment_tasav_file.py --line {exp.expname.lower()}", stdout=None)
+                              f"cd {cdin} && {path}/comment_tasav_file.py --line {exp.expname_lower}", stdout=None)
             else:
                 cmd = env.ssh('jops@archive.jive.eu',
-                              f"cd {cdin} && {path}/comment_tasav_file.py {exp.expname.lower()}", stdout=None)
+                              f"cd {cdin} && {path}/comment_tasav_file.py {exp.expname_lower}", stdout=None)
             exp.log(cmd)
 
     return True
@@ -364,20 +347,20 @@ def comment_tasav_files(exp) -> bool:
 def pipeline_feedback(exp) -> bool:
     """Runs the feedback.pl script after the EVN Pipeline has run.
     """
-    cd = f"cd /data/pipe/{exp.expname.lower()}/out"
-    pipepasses = [apass for apass in exp.correlator_passes if apass.pipeline]
+    cd = f"cd /data/pipe/{exp.expname_lower}/out"
+    pipepasses = exp.pipeline_passes
     if len(pipepasses) > 1:
         for p in range(1, len(pipepasses) + 1):
             cmd = env.ssh('jops@archive.jive.eu',
                           f"{cd} && /home/jops/opt/evn_support/feedback.pl " \
-                          f"-exp '{exp.expname.lower()}_{p}' " \
+                          f"-exp '{exp.expname_lower}_{p}' " \
                           f"-jss '{exp.supsci}' -source "
                           f"'{' '.join([s.name for s in exp.sources])}'", stdout=None)
             exp.log(cmd)
     else:
         cmd = env.ssh('jops@archive.jive.eu',
                       f"{cd} && /home/jops/opt/evn_support/feedback.pl " \
-                      f"-exp '{exp.expname.lower()}' " \
+                      f"-exp '{exp.expname_lower}' " \
                       f"-jss '{exp.supsci}' -source " \
                       f"'{' '.join([s.name for s in exp.sources])}'", stdout=None)
         exp.log(cmd)
@@ -387,11 +370,12 @@ def pipeline_feedback(exp) -> bool:
 def archive(exp) -> bool:
     """Archives the EVN Pipeline results.
     """
-    for f in ('in', 'out'):
-        cd = f"cd /data/pipe/{exp.expname.lower()}/{f}/"
-        cmd = env.ssh('jops@archive.jive.eu', f"{cd} && /home/jops/bin/archive.pl " \
-                      f"-pipe -e {exp.expname.lower()}_{exp.obsdate}", stdout=None)
-        exp.log(cmd)
+    # Both folders are archived within a single ssh connection. Independently: a failure
+    # archiving one of them does not prevent archiving the other one
+    cmd, _ = env.ssh('jops@archive.jive.eu', '; '.join([f"cd /data/pipe/{exp.expname_lower}/{f}/ " \
+                     f"&& /home/jops/bin/archive.pl -pipe -e {exp.expname_lower}_{exp.obsdate}"
+                     for f in ('in', 'out')]), stdout=None)
+    exp.log(cmd)
 
     return True
 
@@ -401,7 +385,7 @@ def archive(exp) -> bool:
 def ampcal(exp) -> bool:
     """Runs the ampcal.sh script to incorporate the gain corrections into the Grafana database.
     """
-    cd = f"cd /data/pipe/{exp.expname.lower()}/out"
+    cd = f"cd /data/pipe/{exp.expname_lower}/out"
     cmd = env.ssh('jops@archive.jive.eu', f"{cd} && ampcal.sh")
     exp.log(cmd)
     return True
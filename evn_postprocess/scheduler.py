@@ -159,11 +159,11 @@ def getting_pipeline_files(exp: experiment.Experiment) -> bool:
 def protect_archive_data(exp: experiment.Experiment) -> bool:
     """Opens a web browser to the authentification page for EVN experiments
     """
-    if len([s.name for s in exp.sources if s.protected]) > 0:
+    if len(protected_sources := exp.source_names(protected=True)) > 0:
         rprint("[center][bold red]You now need to protect the archived data[/bold red][/center]")
         rprint("Open https://archive.jive.eu/scripts/pipe/admin.php")
         print("And protect the following sources: "
-              f"{', '.join([s.name for s in exp.sources if s.protected])}")
+              f"{', '.join(protected_sources)}")
         raise ManualInteractionRequired('')
     else:
         rprint("\n\n[green]No sources require protection.[/green]\n\n")